@@ -1,23 +1,71 @@
 import os
+import json
+import asyncio
+import threading
+from contextlib import contextmanager
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
 from dotenv import load_dotenv
+from asistente_restaurante.catalogo import CONDITION_LABELS, CatalogCache
+from asistente_restaurante.notificaciones import CATALOG_CHANNEL, USER_CHANNEL, NotificationListener
+from asistente_restaurante.perfiles import UserProfileCache
+from asistente_restaurante.prompt import construir_system_prompt
+from asistente_restaurante.cache_respuestas import ResponseCache
+from asistente_restaurante.persistencia import ChatWriter, insertar_mensajes
+from asistente_restaurante.resumen import ConversationSummarizer
 
 # Cargar variables de entorno
 load_dotenv()
 
-# Inicializar cliente de Azure OpenAI
-client = AzureOpenAI(
+# Inicializar cliente asíncrono de Azure OpenAI (no bloquea el event loop)
+client = AsyncAzureOpenAI(
     api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
     azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
     api_key=os.getenv("AZURE_OPENAI_KEY")
 )
 DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT")
 
+# Tamaño del pool de conexiones a la base de datos
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+
+# Segundos que el catálogo en caché es válido aunque no llegue ningún aviso de cambio
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+
+# Caché de respuestas: "exact" (mensaje normalizado) o "similar" (similitud de trigramas)
+RESPONSE_CACHE_MODE = os.getenv("RESPONSE_CACHE_MODE", "exact")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.9"))
+
+# Escritura diferida de los mensajes del chat (los turnos se guardan por lotes en segundo plano)
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "false").lower() == "true"
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "200"))
+
+# Historial: resumen + mensajes literales aún sin resumir; el resumen se actualiza
+# cuando hay CHAT_SUMMARY_BATCH mensajes sin resumir más allá de los CHAT_RECENT_MESSAGES últimos
+CHAT_RECENT_MESSAGES = int(os.getenv("CHAT_RECENT_MESSAGES", "6"))
+CHAT_SUMMARY_BATCH = int(os.getenv("CHAT_SUMMARY_BATCH", "10"))
+
+# Caché de perfiles de usuario (nombre y condiciones médicas)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "600"))
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST"),
+    "port": os.getenv("POSTGRES_PORT"),
+    "dbname": os.getenv("POSTGRES_DB"),
+    "user": os.getenv("POSTGRES_USER"),
+    "password": os.getenv("POSTGRES_PASSWORD"),
+}
+
 # Inicializar FastAPI
 app = FastAPI()
 
@@ -33,76 +81,190 @@ app.add_middleware(
 class ChatInput(BaseModel):
     user_id: int
     message: str
-
-# Conexión a la base de datos
-def get_db_connection():
-    return psycopg2.connect(
-        host=os.getenv("DB_HOST"),
-        port=os.getenv("POSTGRES_PORT"),
-        dbname=os.getenv("POSTGRES_DB"),
-        user=os.getenv("POSTGRES_USER"),
-        password=os.getenv("POSTGRES_PASSWORD")
+    stream: bool = False  # True para recibir la respuesta como Server-Sent Events
+
+# Pool de conexiones compartido (se crea al iniciar y se cierra al apagar)
+db_pool = None
+
+# Perfiles de usuario en caché: evita consultar users en cada turno
+user_profiles = UserProfileCache(max_entries=USER_CACHE_SIZE, ttl_seconds=USER_CACHE_TTL)
+notification_listener = None
+chat_writer = None
+db_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX_SIZE)
+
+# Vaciar las cachés que dependen de avisos de la base de datos
+def invalidar_caches():
+    catalog_cache.invalidate()
+    user_profiles.clear()
+
+@app.on_event("startup")
+def open_db_pool():
+    global db_pool, notification_listener, chat_writer
+    db_pool = ThreadedConnectionPool(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, **DB_CONFIG)
+    notification_listener = NotificationListener(
+        lambda: psycopg2.connect(**DB_CONFIG),
+        handlers={
+            CATALOG_CHANNEL: lambda payload: catalog_cache.invalidate(),
+            USER_CHANNEL: lambda payload: user_profiles.invalidate(int(payload)),
+        },
+        on_reconnect=invalidar_caches
     )
+    notification_listener.start()
+    if CHAT_WRITE_BEHIND:
+        chat_writer = ChatWriter(get_db_connection, batch_size=CHAT_WRITE_BATCH_SIZE)
+        chat_writer.start()
+
+@app.on_event("shutdown")
+def close_db_pool():
+    if notification_listener is not None:
+        notification_listener.stop()
+    # Guardar los mensajes pendientes antes de cerrar el pool
+    if chat_writer is not None:
+        chat_writer.stop()
+    if db_pool is not None:
+        db_pool.closeall()
+
+# Conexión a la base de datos: toma una conexión del pool y la devuelve al terminar.
+# El semáforo hace que, si el pool está agotado, se espere en lugar de fallar.
+@contextmanager
+def get_db_connection():
+    with db_pool_slots:
+        conn = db_pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            db_pool.putconn(conn)
+
+# Catálogo en caché: evita leer y formatear platos y restaurantes en cada turno;
+# los menús vencidos se rearman en segundo plano con una conexión propia del pool
+catalog_cache = CatalogCache(ttl_seconds=CATALOG_CACHE_TTL, get_connection=get_db_connection)
 
 # Obtener información del usuario
-def get_user_info(user_id: int):
-    with get_db_connection() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("SELECT * FROM users WHERE id = %s", (user_id,))
-            user = cur.fetchone()
-            if not user:
-                raise HTTPException(status_code=404, detail="Usuario no encontrado")
-            return user
+def get_user_info(conn, user_id: int):
+    user = user_profiles.get(user_id)
+    if user is not None:
+        return user
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT id, full_name, hypertension, obesity, diabetes
+            FROM users
+            WHERE id = %s
+        """, (user_id,))
+        user = cur.fetchone()
+        if not user:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+        user_profiles.put(user_id, user)
+        return user
+
+# Respuestas ya generadas para preguntas de apertura repetidas
+response_cache = ResponseCache(
+    max_entries=RESPONSE_CACHE_SIZE,
+    ttl_seconds=RESPONSE_CACHE_TTL,
+    mode=RESPONSE_CACHE_MODE,
+    similarity_threshold=RESPONSE_CACHE_SIMILARITY
+)
 
 # Palabras clave fuera de contexto (opcional)
 PROHIBITED_KEYWORDS = ["python", "java", "programa", "algoritmo", "script", "modelo", "código", "machine learning", "deportes", "clima", "noticias"]
 
-# Filtrar platos según condiciones del usuario
-def filtrar_platos_para_usuario(platos, condiciones_usuario):
-    relevantes = []
-    for p in platos:
-        beneficios = " ".join([
-            (p.get("category") or "").lower(),
-            (p.get("subcategory") or "").lower()
-        ])
-        if all(cond.lower() in beneficios for cond in condiciones_usuario):
-            relevantes.append(p)
-    return relevantes
-
-# Obtener informacion de restaurantes
-def get_restaurantes_para_usuario(condiciones_usuario):
+# Obtener informacion de restaurantes (nombre -> texto para el prompt)
+def get_restaurantes_para_usuario(conn, condiciones_usuario):
+    return catalog_cache.get_restaurantes(conn)
+
+# Obtener menú personalizado (MenuIndex con los platos aptos para las condiciones)
+def get_menu_para_usuario(conn, condiciones_usuario):
+    return catalog_cache.get_menu(conn, condiciones_usuario)
+
+# Resumen incremental de la conversación
+summarizer = ConversationSummarizer(
+    client,
+    DEPLOYMENT_NAME,
+    get_db_connection,
+    run_in_threadpool,
+    mensajes_recientes=CHAT_RECENT_MESSAGES,
+    mensajes_por_resumen=CHAT_SUMMARY_BATCH
+)
+background_tasks = set()
+
+# Cargar todo el contexto del turno usando una sola conexión del pool
+def cargar_contexto_chat(user_id: int):
     with get_db_connection() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("SELECT * FROM restaurant")
-            restaurantes = cur.fetchall()            
-
-            restaurante_info = "\n".join([
-                f"Restaurante: {p['name']}\n"
-                f"Ubicacion: {p['location']}\n"
-                f"Puntuacion: {p['rating']}\n"                
-                f"Descripcion: {p['description']}\n"                
-                for p in restaurantes
-            ])
-            return restaurante_info
-
-
-# Obtener menú personalizado
-def get_menu_para_usuario(condiciones_usuario):
+        user_info = get_user_info(conn, user_id)
+
+        etiquetas = [c for c in CONDITION_LABELS if user_info[c]]
+        condiciones = [CONDITION_LABELS[c] for c in etiquetas]
+
+        menu = get_menu_para_usuario(conn, etiquetas)
+        restaurantes = get_restaurantes_para_usuario(conn, etiquetas)
+        resumen, history, resumen_pendiente = summarizer.cargar_contexto(conn, user_id)
+        return user_info, condiciones, menu, restaurantes, resumen, history, resumen_pendiente
+
+# Guardar el turno (mensaje del usuario y respuesta) en una sola sentencia,
+# o encolarlo si la escritura diferida está activa
+def guardar_conversacion(user_id: int, user_input: str, assistant_reply: str):
+    filas = [(user_id, "user", user_input), (user_id, "assistant", assistant_reply)]
+    if chat_writer is not None:
+        chat_writer.enqueue(filas)
+        return
     with get_db_connection() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("SELECT * FROM dishes WHERE is_active = TRUE")
-            platos = cur.fetchall()
-            platos_filtrados = filtrar_platos_para_usuario(platos, condiciones_usuario)
-
-            menu_texto = "\n".join([
-                f"{p['name']} ({p['price_cop']} COP) - Restaurante: {p['restaurant']}\n"
-                f"Descripción: {p['description']}\n"
-                f"Ingredientes: {p['ingredients']}\n"                
-                f"Beneficios: {p['health_benefits']}\n"
-                #f"Control de: {p['category']}\n"
-                for p in platos_filtrados
-            ])
-            return menu_texto or "No hay platos disponibles que se ajusten a tus condiciones médicas." 
+        insertar_mensajes(conn, filas)
+
+# Guardar una respuesta de apertura en caché (su prompt no lleva datos personales)
+def guardar_en_cache(user_input: str, cache_info: tuple, assistant_reply: str):
+    condiciones, version = cache_info
+    response_cache.put(user_input, condiciones, version, assistant_reply)
+
+# Formatear un evento SSE
+def evento_sse(data: dict, event: str = None):
+    linea = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return f"event: {event}\n{linea}" if event else linea
+
+# Respuesta completa (ya conocida) enviada como un único evento SSE
+def respuesta_sse(texto: str):
+    return StreamingResponse(
+        iter([evento_sse({"delta": texto}), evento_sse({"response": texto}, event="done")]),
+        media_type="text/event-stream"
+    )
+
+# Reenviar los tokens del modelo a medida que llegan y guardar la respuesta al final
+async def stream_respuesta(user_id: int, user_input: str, messages: list, cache_info: tuple = None):
+    partes = []
+    stream = None
+    try:
+        stream = await client.chat.completions.create(
+            model=DEPLOYMENT_NAME,
+            messages=messages,
+            temperature=0.3,
+            max_tokens=200,
+            stream=True
+        )
+        async for chunk in stream:
+            # Azure envía fragmentos sin choices (p. ej. resultados del filtro de contenido)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                partes.append(delta)
+                yield evento_sse({"delta": delta})
+        stream = None
+
+        assistant_reply = "".join(partes)
+        await run_in_threadpool(guardar_conversacion, user_id, user_input, assistant_reply)
+        if cache_info is not None:
+            guardar_en_cache(user_input, cache_info, assistant_reply)
+        yield evento_sse({"response": assistant_reply}, event="done")
+
+    except Exception as e:
+        yield evento_sse({"error": str(e)}, event="error")
+    finally:
+        # Si el cliente se desconecta a mitad de la respuesta se corta también la del modelo
+        # (el turno incompleto no se guarda)
+        if stream is not None:
+            await stream.close()
 
 # Endpoint del chatbot
 @app.post("/chat")
@@ -112,69 +274,65 @@ async def chat_endpoint(payload: ChatInput):
 
     # Filtro simple para evitar temas fuera de contexto
     if any(word in user_input.lower() for word in PROHIBITED_KEYWORDS):
-        return {"response": "Lo siento, solo puedo ayudarte con recomendaciones de alimentación saludable."}
-
-    user_info = get_user_info(user_id)
-
-    condiciones = []
-    if user_info["hypertension"]:
-        condiciones.append("hipertensión")
-    if user_info["obesity"]:
-        condiciones.append("obesidad")
-    if user_info["diabetes"]:
-        condiciones.append("diabetes")
-
-    condiciones_str = ", ".join(condiciones) if condiciones else "ninguna condición específica"
-    menu_texto = get_menu_para_usuario(condiciones)
-    restaurante_info = get_restaurantes_para_usuario(condiciones)
+        rechazo = "Lo siento, solo puedo ayudarte con recomendaciones de alimentación saludable."
+        if payload.stream:
+            return respuesta_sse(rechazo)
+        return {"response": rechazo}
+
+    # Las consultas son bloqueantes: se ejecutan fuera del event loop
+    user_info, condiciones, menu, restaurantes, resumen, history, resumen_pendiente = await run_in_threadpool(
+        cargar_contexto_chat, user_id
+    )
 
-    # Instrucción al sistema
+    # Resumir en segundo plano los mensajes viejos; no afecta a este turno
+    if resumen_pendiente:
+        task = asyncio.create_task(summarizer.actualizar(user_id))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    # Las preguntas de apertura (sin historial) no dependen de la conversación: se pueden
+    # responder desde la caché, cuya clave incluye la versión del catálogo. Su prompt
+    # no lleva el nombre del usuario, así la respuesta sirve para cualquiera con
+    # las mismas condiciones. Mientras el menú se rearma en segundo plano no se usa
+    # la caché (el menú anterior no corresponde a la versión actual)
+    cache_info = None
+    nombre = user_info["full_name"]
+    if not history and not resumen and menu.version == catalog_cache.version:
+        cache_info = (condiciones, catalog_cache.version)
+        nombre = None
+        cached_reply = response_cache.get(user_input, condiciones, catalog_cache.version)
+        if cached_reply is not None:
+            await run_in_threadpool(guardar_conversacion, user_id, user_input, cached_reply)
+            if payload.stream:
+                return respuesta_sse(cached_reply)
+            return {"response": cached_reply}
+
+    # Instrucción al sistema: preámbulo fijo + la parte del catálogo más relevante
     system_prompt = {
-    "role": "system",
-    "content": f"""
-Eres MarIA, una asistente experta en alimentación saludable.
-
-Estás conversando con {user_info['full_name']}, quien tiene las siguientes condiciones médicas: {condiciones_str}.
-
-Tu tarea es ayudarle a elegir platos adecuados para su salud, *sin dar toda la información de una sola vez*. En esta primera interacción, solo debes sugerir entre 2 y 4 platos, mencionando brevemente por qué podrían ser adecuados. No menciones los ingredientes completos ni el restaurante aún.
-
-Este es el menú disponible: {menu_texto}
-Este es el listado de restaurantes: {restaurante_info}
-
-
-Después de hacer las recomendaciones, *pregunta al usuario si desea saber más detalles sobre alguno de esos platos* (por ejemplo: ingredientes, beneficios específicos o en qué restaurante se encuentran).
-
-Si el usuario menciona un plato, entonces sí puedes dar más detalles, incluyendo el restaurante y la ubicación. Si pregunta por el restaurante, entonces puedes describirlo.
-
-Nunca respondas preguntas fuera del contexto de alimentación saludable o del menú disponible.
-
-Sé clara, amable y breve en tus respuestas. Recuerda siempre guiar la conversación paso a paso.
-
-(Usa maximo 190 tokens para cada una de tus respuestas)
-"""
-}
-
-    # Historial de la conversación
-    with get_db_connection() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("""
-                SELECT role, content
-                FROM chat_messages
-                WHERE user_id = %s
-                ORDER BY timestamp DESC
-                LIMIT 10
-            """, (user_id,))
-            history = cur.fetchall()
+        "role": "system",
+        "content": construir_system_prompt(
+            nombre, condiciones, menu, restaurantes, user_input
+        )
+    }
 
     # Construir mensajes para el modelo
     messages = [system_prompt]
+    if resumen:
+        messages.append({"role": "system", "content": f"Resumen de la conversación anterior: {resumen}"})
     for msg in reversed(history):
         messages.append({"role": msg["role"], "content": msg["content"]})
     messages.append({"role": "user", "content": user_input})
 
+    if payload.stream:
+        return StreamingResponse(
+            stream_respuesta(user_id, user_input, messages, cache_info),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
     try:
         # Llamar al modelo de Azure OpenAI
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=DEPLOYMENT_NAME,
             messages=messages,
             temperature=0.3,
@@ -183,19 +341,16 @@ Sé clara, amable y breve en tus respuestas. Recuerda siempre guiar la conversac
         assistant_reply = response.choices[0].message.content
 
         # Guardar conversación en la base de datos
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO chat_messages (user_id, role, content)
-                    VALUES (%s, %s, %s)
-                """, (user_id, "user", user_input))
-                cur.execute("""
-                    INSERT INTO chat_messages (user_id, role, content)
-                    VALUES (%s, %s, %s)
-                """, (user_id, "assistant", assistant_reply))
-                conn.commit()
+        await run_in_threadpool(guardar_conversacion, user_id, user_input, assistant_reply)
+        if cache_info is not None:
+            guardar_en_cache(user_input, cache_info, assistant_reply)
 
         return {"response": assistant_reply}
 
     except Exception as e:
         return {"error": str(e)}
+
+# Métricas de la caché de respuestas
+@app.get("/chat/cache/stats")
+def response_cache_stats():
+    return response_cache.stats()
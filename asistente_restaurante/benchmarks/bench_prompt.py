@@ -0,0 +1,90 @@
+"""
+Costo de armar el system prompt con catálogos de 100, 10.000 y 100.000 platos.
+
+Mide la construcción del MenuIndex (una vez por conjunto de condiciones y
+recarga del catálogo) y construir_system_prompt por turno, con platos sintéticos.
+
+    python -m asistente_restaurante.benchmarks.bench_prompt
+"""
+import argparse
+import random
+import statistics
+import time
+
+from asistente_restaurante.catalogo import MenuIndex, formatear_restaurante
+from asistente_restaurante.prompt import construir_system_prompt, estimar_tokens, PROMPT_TOKEN_BUDGET
+
+PROTEINAS = ["pollo", "pescado", "res", "cerdo", "tofu", "garbanzos", "lentejas", "camarón"]
+INGREDIENTES = [
+    "arroz integral", "quinua", "aguacate", "espinaca", "tomate", "cebolla", "ajo", "limón",
+    "coco", "plátano", "yuca", "mango", "pepino", "zanahoria", "brócoli", "avena", "almendras",
+]
+BENEFICIOS = ["bajo en sodio", "bajo índice glucémico", "alto en fibra", "bajo en grasa", "rico en proteína"]
+MENSAJES = [
+    "hola, quiero algo con pescado y bajo en sodio",
+    "¿qué me recomiendas para la cena?",
+    "tengo ganas de pollo con arroz integral y aguacate",
+    "algo vegetariano con lentejas o garbanzos",
+]
+
+
+def generar_catalogo(n_platos: int, n_restaurantes: int, rng: random.Random):
+    restaurantes = [
+        {"name": f"Restaurante {r}", "location": f"Calle {r} #10-20, Cartagena",
+         "rating": round(rng.uniform(3, 5), 1), "description": "Cocina saludable del Caribe"}
+        for r in range(n_restaurantes)
+    ]
+    platos = []
+    for i in range(n_platos):
+        proteina = rng.choice(PROTEINAS)
+        ingredientes = ", ".join(rng.sample(INGREDIENTES, 5))
+        platos.append({
+            "id": i,
+            "name": f"{proteina.capitalize()} al estilo {i}",
+            "price_cop": rng.randrange(15000, 60000, 500),
+            "restaurant": rng.choice(restaurantes)["name"],
+            "rating": round(rng.uniform(1, 5), 1),
+            "description": f"Plato de {proteina} con {ingredientes.split(', ')[0]}",
+            "ingredients": ingredientes,
+            "health_benefits": ", ".join(rng.sample(BENEFICIOS, 2)),
+            "main_protein": proteina,
+        })
+    return platos, {r["name"]: formatear_restaurante(r) for r in restaurantes}
+
+
+def medir(fn, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--turnos", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    condiciones = ["diabetes", "hipertensión"]
+    print(f"presupuesto={PROMPT_TOKEN_BUDGET} tokens, {args.turnos} turnos por tamaño")
+    for n in args.tamanos:
+        platos, restaurantes = generar_catalogo(n, max(n // 50, 5), rng)
+        menu, construccion = medir(lambda: MenuIndex(platos, condiciones), 1)
+        prompts, turnos = medir(
+            lambda: [construir_system_prompt("Ana", condiciones, menu, restaurantes, m) for m in MENSAJES],
+            args.turnos // len(MENSAJES),
+        )
+        por_turno = [t / len(MENSAJES) * 1000 for t in turnos]
+        tokens = max(estimar_tokens(p) for p in prompts)
+        print(
+            f"{n:>7} platos: índice {construccion[0] * 1000:8.1f} ms | "
+            f"prompt p50 {statistics.median(por_turno):6.2f} ms, máx {max(por_turno):6.2f} ms | "
+            f"~{tokens} tokens con el preámbulo"
+        )
+
+
+if __name__ == "__main__":
+    main()
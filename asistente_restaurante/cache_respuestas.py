@@ -0,0 +1,123 @@
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+
+
+def normalizar_mensaje(texto: str) -> str:
+    # Minúsculas, sin tildes ni signos y con espacios simples: "¿Qué puedo comer?" -> "que puedo comer"
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", texto))
+
+def vector_trigramas(texto: str) -> Counter:
+    # Representación local y barata del mensaje para comparar por similitud coseno
+    texto = f"  {texto} "
+    return Counter(texto[i:i + 3] for i in range(len(texto) - 2))
+
+def similitud_coseno(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    producto = sum(v * b[k] for k, v in a.items() if k in b)
+    return producto / (math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values())))
+
+
+class ResponseCache:
+    """
+    Caché LRU con TTL de respuestas del modelo.
+
+    La clave es el mensaje normalizado, el conjunto de condiciones del usuario y
+    la versión del catálogo. En modo "similar" también se aceptan mensajes cuya
+    similitud (coseno sobre trigramas de caracteres) supere `similarity_threshold`.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, mode: str = "exact", similarity_threshold: float = 0.9):
+        if mode not in ("exact", "similar"):
+            raise ValueError(f"Modo de caché desconocido: {mode}")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.mode = mode
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # clave -> (respuesta, vence_en, vector); el orden es el de uso (LRU)
+        self._entries = OrderedDict()
+        # (versión, condiciones) -> claves de ese grupo, para la búsqueda por similitud
+        self._buckets = {}
+
+    @staticmethod
+    def _bucket(condiciones, version):
+        return (version, frozenset(condiciones))
+
+    def _remove(self, clave):
+        self._entries.pop(clave, None)
+        grupo = self._buckets.get(clave[0])
+        if grupo is not None:
+            grupo.discard(clave)
+            if not grupo:
+                del self._buckets[clave[0]]
+
+    def _lookup(self, clave, vector, ahora):
+        entrada = self._entries.get(clave)
+        if entrada is not None:
+            if entrada[1] > ahora:
+                return clave
+            self._remove(clave)
+
+        if self.mode != "similar":
+            return None
+        mejor, mejor_similitud = None, self.similarity_threshold
+        for otra in list(self._buckets.get(clave[0], ())):
+            respuesta, vence_en, otro_vector = self._entries[otra]
+            if vence_en <= ahora:
+                self._remove(otra)
+                continue
+            similitud = similitud_coseno(vector, otro_vector)
+            if similitud >= mejor_similitud:
+                mejor, mejor_similitud = otra, similitud
+        return mejor
+
+    def get(self, mensaje: str, condiciones, version: int):
+        normalizado = normalizar_mensaje(mensaje)
+        clave = (self._bucket(condiciones, version), normalizado)
+        vector = vector_trigramas(normalizado) if self.mode == "similar" else None
+        with self._lock:
+            encontrada = self._lookup(clave, vector, time.monotonic())
+            if encontrada is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(encontrada)
+            return self._entries[encontrada][0]
+
+    def put(self, mensaje: str, condiciones, version: int, respuesta: str):
+        normalizado = normalizar_mensaje(mensaje)
+        if not normalizado:
+            return
+        grupo = self._bucket(condiciones, version)
+        clave = (grupo, normalizado)
+        vector = vector_trigramas(normalizado) if self.mode == "similar" else None
+        with self._lock:
+            self._remove(clave)
+            self._entries[clave] = (respuesta, time.monotonic() + self.ttl_seconds, vector)
+            self._buckets.setdefault(grupo, set()).add(clave)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from psycopg2.extras import RealDictCursor
+from asistente_restaurante.prompt import estimar_tokens, normalizar_palabras, puntaje_base
+
+# Columnas de users con las condiciones (iguales a las etiquetas de dishes.conditions)
+# y el nombre con el que se mencionan en el prompt
+CONDITION_LABELS = {
+    "hypertension": "hipertensión",
+    "obesity": "obesidad",
+    "diabetes": "diabetes",
+}
+
+# Columnas de dishes que se indexan para buscar coincidencias con el mensaje
+COLUMNAS_INDEXADAS = ("name", "description", "ingredients", "health_benefits", "main_protein")
+
+logger = logging.getLogger(__name__)
+
+def formatear_plato(p):
+    return (
+        f"{p['name']} ({p['price_cop']} COP) - Restaurante: {p['restaurant']}\n"
+        f"Descripción: {p['description']}\n"
+        f"Ingredientes: {p['ingredients']}\n"
+        f"Beneficios: {p['health_benefits']}\n"
+    )
+
+def formatear_restaurante(p):
+    return (
+        f"Restaurante: {p['name']}\n"
+        f"Ubicacion: {p['location']}\n"
+        f"Puntuacion: {p['rating']}\n"
+        f"Descripcion: {p['description']}\n"
+    )
+
+
+class MenuIndex:
+    """
+    Platos de un conjunto de condiciones con su texto, tokens estimados,
+    puntaje base e índice invertido de palabras ya calculados. `version` es la
+    versión del catálogo con la que se armó.
+    """
+
+    def __init__(self, platos, condiciones, version: int = 0):
+        self.version = version
+        palabras_condicion = set(normalizar_palabras(" ".join(condiciones)))
+        self.fragmentos = [formatear_plato(p) for p in platos]
+        self.tokens = [estimar_tokens(f) for f in self.fragmentos]
+        self.restaurantes = [p["restaurant"] for p in platos]
+        palabras_por_plato = [
+            set(normalizar_palabras(" ".join(str(p[c] or "") for c in COLUMNAS_INDEXADAS)))
+            for p in platos
+        ]
+        self.base = [
+            puntaje_base(float(p["rating"] or 0), len(palabras & palabras_condicion))
+            for p, palabras in zip(platos, palabras_por_plato)
+        ]
+        self.por_relevancia = sorted(range(len(platos)), key=lambda i: self.base[i], reverse=True)
+        # Índice invertido palabra -> platos, cada lista ordenada por puntaje base
+        self.indice = defaultdict(list)
+        for i in self.por_relevancia:
+            for palabra in palabras_por_plato[i]:
+                self.indice[palabra].append(i)
+
+
+class CatalogCache:
+    """
+    Catálogo de platos y restaurantes en memoria del proceso.
+
+    Se recarga cuando vence el TTL o cuando el backend avisa de un cambio, y
+    guarda un MenuIndex por cada conjunto de condiciones.
+    Los platos de cada conjunto se consultan con el índice GIN de dishes.conditions.
+    Con `get_connection`, un MenuIndex desactualizado se sigue usando mientras se
+    arma el nuevo en segundo plano; sin él se rearma en el turno que lo pide.
+    """
+
+    def __init__(self, ttl_seconds: float, get_connection=None):
+        self.ttl_seconds = ttl_seconds
+        self.get_connection = get_connection
+        self.version = 0
+        self._lock = threading.Lock()
+        # condiciones -> MenuIndex más reciente (puede ser de una versión anterior)
+        self._menus = {}
+        # condiciones -> hilo que está rearmando su MenuIndex
+        self._rebuilds = {}
+        self._reset()
+
+    def _reset(self):
+        self._restaurantes = None
+        self._expires_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._reset()
+
+    def _ensure_loaded(self, conn):
+        """
+        Devuelve (versión, restaurantes) vigentes. Si venció el TTL o hubo una
+        invalidación, la consulta se hace fuera del lock y luego se reemplaza el
+        catálogo, con una versión nueva (la caché de respuestas depende de ella).
+        """
+        with self._lock:
+            if self._restaurantes is not None and time.monotonic() < self._expires_at:
+                return self.version, self._restaurantes
+            version = self.version
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT * FROM restaurant")
+            restaurantes = {p["name"]: formatear_restaurante(p) for p in cur.fetchall()}
+        with self._lock:
+            if self.version == version:
+                self.version += 1
+                self._reset()
+                self._restaurantes = restaurantes
+                self._expires_at = time.monotonic() + self.ttl_seconds
+            elif self._restaurantes is None:
+                # Invalidado durante la consulta: se responde con lo leído sin guardarlo
+                return self.version, restaurantes
+            # Si otro turno ya recargó mientras tanto, se usa su catálogo
+            return self.version, self._restaurantes
+
+    def _build_menu(self, conn, clave, version: int):
+        # La consulta y el índice se arman sin el lock: los demás turnos siguen atendiéndose
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT id, name, price_cop, restaurant, rating, description,
+                       ingredients, health_benefits, main_protein
+                FROM dishes
+                WHERE is_active = TRUE AND conditions @> %s::varchar[]
+                ORDER BY id
+            """, (sorted(clave),))
+            platos = cur.fetchall()
+        menu = MenuIndex(platos, [CONDITION_LABELS[c] for c in clave], version)
+        with self._lock:
+            # No se reemplaza un índice armado para una versión más nueva
+            actual = self._menus.get(clave)
+            if actual is None or actual.version < version:
+                self._menus[clave] = menu
+            return self._menus[clave]
+
+    def _rebuild(self, clave, version: int):
+        try:
+            with self.get_connection() as conn:
+                self._build_menu(conn, clave, version)
+        except Exception:
+            logger.exception("No se pudo rearmar el menú de %s", sorted(clave))
+        finally:
+            with self._lock:
+                self._rebuilds.pop(clave, None)
+
+    def get_menu(self, conn, condiciones_usuario):
+        clave = frozenset(condiciones_usuario)
+        version, _ = self._ensure_loaded(conn)
+        hilo = None
+        with self._lock:
+            menu = self._menus.get(clave)
+            if menu is not None and menu.version >= version:
+                return menu
+            if menu is not None and self.get_connection is not None and clave not in self._rebuilds:
+                hilo = threading.Thread(
+                    target=self._rebuild, args=(clave, version), name="menu-rebuild", daemon=True
+                )
+                self._rebuilds[clave] = hilo
+        if menu is None or self.get_connection is None:
+            # Primera vez para estas condiciones (o sin conexiones propias): no hay con qué responder
+            return self._build_menu(conn, clave, version)
+        # Se responde con el índice anterior y el nuevo se arma en segundo plano
+        if hilo is not None:
+            hilo.start()
+        return menu
+
+    def get_restaurantes(self, conn):
+        return self._ensure_loaded(conn)[1]
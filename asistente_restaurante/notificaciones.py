@@ -0,0 +1,66 @@
+import logging
+import select
+import threading
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+logger = logging.getLogger(__name__)
+
+# Canales por los que el backend avisa de cambios (ver backend/app/db/notify.py)
+CATALOG_CHANNEL = "catalog_changed"
+USER_CHANNEL = "user_changed"
+
+
+class NotificationListener(threading.Thread):
+    """
+    Escucha canales LISTEN/NOTIFY en una conexión dedicada y llama al handler
+    de cada canal con el payload recibido.
+
+    `on_reconnect` se llama cada vez que se (re)establece la escucha, porque
+    mientras no se escuchaba pudo haber cambios sin aviso.
+    """
+
+    def __init__(self, connect, handlers: dict, on_reconnect=None, poll_seconds: float = 5.0):
+        super().__init__(name="notification-listener", daemon=True)
+        self.connect = connect
+        self.handlers = handlers
+        self.on_reconnect = on_reconnect
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _dispatch(self, notify):
+        handler = self.handlers.get(notify.channel)
+        if handler is None:
+            return
+        try:
+            handler(notify.payload)
+        except Exception:
+            logger.exception("Error procesando aviso del canal %s", notify.channel)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = self.connect()
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    for channel in self.handlers:
+                        cur.execute(f"LISTEN {channel}")
+                if self.on_reconnect is not None:
+                    self.on_reconnect()
+
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], self.poll_seconds) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0))
+            except psycopg2.Error:
+                logger.exception("Error escuchando avisos de la base de datos, reintentando")
+                self._stop_event.wait(self.poll_seconds)
+            finally:
+                if conn is not None:
+                    conn.close()
@@ -0,0 +1,42 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class UserProfileCache:
+    """
+    Caché LRU con TTL de los datos del usuario que usa el chat
+    (nombre y condiciones). El backend avisa por NOTIFY cuando cambian.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (perfil, vence_en)
+
+    def get(self, user_id: int):
+        with self._lock:
+            entrada = self._entries.get(user_id)
+            if entrada is None:
+                return None
+            if entrada[1] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entrada[0]
+
+    def put(self, user_id: int, perfil: dict):
+        with self._lock:
+            self._entries[user_id] = (perfil, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,68 @@
+import logging
+import queue
+import threading
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+INSERT_MENSAJES_SQL = "INSERT INTO chat_messages (user_id, role, content) VALUES %s"
+
+# Insertar varios mensajes (user_id, role, content) en una sola sentencia
+def insertar_mensajes(conn, filas):
+    with conn.cursor() as cur:
+        execute_values(cur, INSERT_MENSAJES_SQL, filas, page_size=max(len(filas), 1))
+
+
+class ChatWriter(threading.Thread):
+    """
+    Escritura diferida (write-behind) de los mensajes del chat.
+
+    Los turnos se encolan sin esperar a la base de datos y un hilo los guarda
+    por lotes, en una transacción por lote. Al detenerlo vacía la cola.
+    """
+
+    def __init__(self, get_connection, batch_size: int = 200, flush_seconds: float = 0.2):
+        super().__init__(name="chat-writer", daemon=True)
+        self.get_connection = get_connection
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+
+    def enqueue(self, filas):
+        self._queue.put(filas)
+
+    def stop(self, timeout: float = 10.0):
+        self._stop_event.set()
+        self.join(timeout)
+
+    def _next_batch(self):
+        lote = []
+        try:
+            lote.extend(self._queue.get(timeout=self.flush_seconds))
+        except queue.Empty:
+            return lote
+        while len(lote) < self.batch_size:
+            try:
+                lote.extend(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _flush(self, lote):
+        try:
+            with self.get_connection() as conn:
+                insertar_mensajes(conn, lote)
+        except Exception:
+            logger.exception("No se pudieron guardar %d mensajes del chat", len(lote))
+
+    def run(self):
+        while not self._stop_event.is_set():
+            lote = self._next_batch()
+            if lote:
+                self._flush(lote)
+        # Vaciar lo que quede en la cola antes de terminar
+        while not self._queue.empty():
+            lote = self._next_batch()
+            if lote:
+                self._flush(lote)
@@ -0,0 +1,123 @@
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Optional
+
+# Tokens disponibles para el menú y los restaurantes dentro del system prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2500"))
+
+# Platos con mejor puntaje base que siempre compiten por entrar, aunque no coincidan con el mensaje
+CANDIDATOS_BASE = 200
+
+# Platos que se revisan por cada palabra del mensaje; las listas del índice vienen
+# ordenadas por puntaje base, así que se revisan los mejores aunque coincidan miles
+MAX_POR_PALABRA = 300
+
+# Pesos del ranking: palabras del mensaje > palabras de las condiciones > puntuación
+PESO_MENSAJE = 2.0
+PESO_CONDICION = 1.0
+PESO_RATING = 0.2
+
+SIN_PLATOS = "No hay platos disponibles que se ajusten a tus condiciones médicas."
+
+STOPWORDS = {
+    "para", "como", "pero", "este", "esta", "esto", "estos", "estas", "tengo", "tiene",
+    "quiero", "puedo", "puede", "algo", "algun", "alguna", "sobre", "donde", "cual",
+    "cuales", "porque", "desde", "hasta", "entre", "menu", "plato",
+    "platos", "comer", "recomienda", "recomiendas", "favor", "hola",
+}
+
+# Parte fija del system prompt: es igual en todas las conversaciones, por eso va primero
+# (el prefijo idéntico permite que Azure OpenAI reutilice su caché de prompt)
+PREAMBULO = """
+Eres MarIA, una asistente experta en alimentación saludable.
+
+Tu tarea es ayudar al usuario a elegir platos adecuados para su salud, *sin dar toda la información de una sola vez*. En esta primera interacción, solo debes sugerir entre 2 y 4 platos, mencionando brevemente por qué podrían ser adecuados. No menciones los ingredientes completos ni el restaurante aún.
+
+Después de hacer las recomendaciones, *pregunta al usuario si desea saber más detalles sobre alguno de esos platos* (por ejemplo: ingredientes, beneficios específicos o en qué restaurante se encuentran).
+
+Si el usuario menciona un plato, entonces sí puedes dar más detalles, incluyendo el restaurante y la ubicación. Si pregunta por el restaurante, entonces puedes describirlo.
+
+Nunca respondas preguntas fuera del contexto de alimentación saludable o del menú disponible.
+
+Sé clara, amable y breve en tus respuestas. Recuerda siempre guiar la conversación paso a paso.
+
+(Usa maximo 190 tokens para cada una de tus respuestas)
+"""
+
+def estimar_tokens(texto: str) -> int:
+    # Aproximación de ~4 caracteres por token, suficiente para respetar el presupuesto
+    return len(texto) // 4 + 1
+
+def normalizar_palabras(texto: str):
+    # Minúsculas y sin tildes, para que "jamón" y "jamon" coincidan
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return [w for w in re.findall(r"[a-z]+", texto) if len(w) > 3 and w not in STOPWORDS]
+
+# Puntaje de un plato que no depende del mensaje (se calcula una vez al cargar el catálogo)
+def puntaje_base(rating: float, coincidencias_condicion: int) -> float:
+    return PESO_CONDICION * coincidencias_condicion + PESO_RATING * rating
+
+# Elegir los platos más relevantes que quepan en el presupuesto
+def seleccionar_platos(menu, mensaje: str, presupuesto: int):
+    puntajes = Counter()
+    for palabra in set(normalizar_palabras(mensaje)):
+        for i in menu.indice.get(palabra, ())[:MAX_POR_PALABRA]:
+            puntajes[i] += PESO_MENSAJE
+
+    candidatos = set(puntajes)
+    candidatos.update(menu.por_relevancia[:CANDIDATOS_BASE])
+    ranking = sorted(candidatos, key=lambda i: (puntajes[i] + menu.base[i], -i), reverse=True)
+
+    seleccion = []
+    usados = 0
+    for i in ranking:
+        if usados + menu.tokens[i] > presupuesto:
+            continue
+        seleccion.append(i)
+        usados += menu.tokens[i]
+    return seleccion, usados
+
+def construir_system_prompt(
+    nombre: Optional[str],
+    condiciones,
+    menu,
+    restaurantes: dict,
+    mensaje: str,
+    presupuesto: int = PROMPT_TOKEN_BUDGET
+) -> str:
+    """
+    Arma el system prompt con el preámbulo fijo y la parte del catálogo más
+    relevante para el mensaje, sin pasar de `presupuesto` tokens estimados.
+    Con `nombre` None el prompt no identifica al usuario (respuestas cacheables).
+    """
+    condiciones_str = ", ".join(condiciones) if condiciones else "ninguna condición específica"
+
+    seleccion, usados = seleccionar_platos(menu, mensaje, presupuesto)
+    menu_texto = "\n".join(menu.fragmentos[i] for i in seleccion) or SIN_PLATOS
+
+    # Restaurantes de los platos elegidos primero; luego el resto mientras quepa
+    nombres = list(dict.fromkeys(menu.restaurantes[i] for i in seleccion))
+    elegidos = set(nombres)
+    nombres += [n for n in restaurantes if n not in elegidos]
+    restaurante_partes = []
+    for nombre_restaurante in nombres:
+        fragmento = restaurantes.get(nombre_restaurante)
+        if fragmento is None:
+            continue
+        tokens = estimar_tokens(fragmento)
+        if usados + tokens > presupuesto:
+            break
+        restaurante_partes.append(fragmento)
+        usados += tokens
+    restaurante_info = "\n".join(restaurante_partes)
+    interlocutor = f"{nombre}, quien tiene" if nombre else "un usuario que tiene"
+
+    return f"""{PREAMBULO}
+Estás conversando con {interlocutor} las siguientes condiciones médicas: {condiciones_str}.
+
+Este es el menú disponible: {menu_texto}
+Este es el listado de restaurantes: {restaurante_info}
+"""
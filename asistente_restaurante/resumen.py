@@ -0,0 +1,137 @@
+import logging
+from psycopg2.extras import RealDictCursor
+
+logger = logging.getLogger(__name__)
+
+INSTRUCCION_RESUMEN = """
+Eres un asistente que resume conversaciones entre MarIA (asistente de alimentación saludable) y un usuario.
+Actualiza el resumen anterior con los mensajes nuevos. Conserva solo lo útil para continuar la conversación:
+platos recomendados o descartados, preferencias, alergias, dudas pendientes y restaurantes mencionados.
+Escribe en español, en tercera persona y en máximo 120 palabras.
+"""
+
+# Resumen guardado del usuario (o None si todavía no hay)
+def get_resumen(conn, user_id: int):
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            "SELECT summary, last_message_id FROM chat_summaries WHERE user_id = %s",
+            (user_id,)
+        )
+        return cur.fetchone()
+
+# Mensajes posteriores al resumen, del más reciente al más antiguo (como mucho `limite`)
+def get_mensajes_sin_resumir(conn, user_id: int, desde_id: int, limite: int):
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT id, role, content
+            FROM chat_messages
+            WHERE user_id = %s AND id > %s
+            ORDER BY timestamp DESC, id DESC
+            LIMIT %s
+        """, (user_id, desde_id, limite))
+        return cur.fetchall()
+
+# Mensajes más antiguos aún sin resumir, en orden cronológico, anteriores a `hasta_id`
+def get_mensajes_para_resumir(conn, user_id: int, desde_id: int, hasta_id: int, limite: int):
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT id, role, content
+            FROM chat_messages
+            WHERE user_id = %s AND id > %s AND id < %s
+            ORDER BY timestamp, id
+            LIMIT %s
+        """, (user_id, desde_id, hasta_id, limite))
+        return cur.fetchall()
+
+def guardar_resumen(conn, user_id: int, resumen: str, last_message_id: int):
+    # Solo avanza: si otro proceso ya resumió más mensajes, se conserva el suyo
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO chat_summaries (user_id, summary, last_message_id, updated_at)
+            VALUES (%s, %s, %s, now())
+            ON CONFLICT (user_id) DO UPDATE
+            SET summary = EXCLUDED.summary,
+                last_message_id = EXCLUDED.last_message_id,
+                updated_at = now()
+            WHERE chat_summaries.last_message_id < EXCLUDED.last_message_id
+        """, (user_id, resumen, last_message_id))
+
+
+class ConversationSummarizer:
+    """
+    Mantiene un resumen incremental por usuario para acotar el historial.
+
+    El prompt lleva el resumen más todos los mensajes que aún no entran en él.
+    Cuando, además de los últimos `mensajes_recientes`, hay `mensajes_por_resumen`
+    mensajes más viejos sin resumir, se pide al modelo (en segundo plano, después
+    del turno) que los integre al resumen, y el prompt vuelve a achicarse.
+    """
+
+    def __init__(self, client, deployment: str, get_connection, run_blocking,
+                 mensajes_recientes: int = 6, mensajes_por_resumen: int = 10):
+        self.client = client
+        self.deployment = deployment
+        self.get_connection = get_connection
+        self.run_blocking = run_blocking
+        self.mensajes_recientes = mensajes_recientes
+        self.mensajes_por_resumen = mensajes_por_resumen
+        self._en_curso = set()
+
+    def cargar_contexto(self, conn, user_id: int):
+        """Devuelve (resumen o None, mensajes sin resumir del más nuevo al más viejo, ¿hay que resumir?)"""
+        resumen = get_resumen(conn, user_id)
+        desde_id = resumen["last_message_id"] if resumen else 0
+        # Todo lo que no está en el resumen va literal, hasta el umbral de resumen;
+        # así ningún mensaje queda fuera del resumen y del prompt a la vez
+        umbral = self.mensajes_recientes + self.mensajes_por_resumen
+        mensajes = get_mensajes_sin_resumir(conn, user_id, desde_id, umbral)
+        pendiente = len(mensajes) >= umbral
+        return (resumen["summary"] if resumen else None), mensajes, pendiente
+
+    def _cargar_para_resumir(self, user_id: int):
+        with self.get_connection() as conn:
+            resumen = get_resumen(conn, user_id)
+            desde_id = resumen["last_message_id"] if resumen else 0
+            # Los más recientes quedan como mensajes literales; se resumen los anteriores,
+            # empezando por los más antiguos para ponerse al día con historiales largos
+            recientes = get_mensajes_sin_resumir(conn, user_id, desde_id, self.mensajes_recientes)
+            if len(recientes) < self.mensajes_recientes:
+                return None, []
+            viejos = get_mensajes_para_resumir(
+                conn, user_id, desde_id, recientes[-1]["id"], self.mensajes_por_resumen
+            )
+        return (resumen["summary"] if resumen else None), viejos
+
+    def _guardar(self, user_id: int, resumen: str, last_message_id: int):
+        with self.get_connection() as conn:
+            guardar_resumen(conn, user_id, resumen, last_message_id)
+
+    async def actualizar(self, user_id: int):
+        # Un solo resumen a la vez por usuario en este proceso
+        if user_id in self._en_curso:
+            return
+        self._en_curso.add(user_id)
+        try:
+            resumen_anterior, viejos = await self.run_blocking(self._cargar_para_resumir, user_id)
+            if not viejos:
+                return
+            conversacion = "\n".join(f"{m['role']}: {m['content']}" for m in viejos)
+            response = await self.client.chat.completions.create(
+                model=self.deployment,
+                messages=[
+                    {"role": "system", "content": INSTRUCCION_RESUMEN},
+                    {"role": "user", "content": (
+                        f"Resumen anterior: {resumen_anterior or '(sin resumen)'}\n\n"
+                        f"Mensajes nuevos:\n{conversacion}"
+                    )},
+                ],
+                temperature=0,
+                max_tokens=250
+            )
+            resumen = response.choices[0].message.content
+            if resumen:
+                await self.run_blocking(self._guardar, user_id, resumen, viejos[-1]["id"])
+        except Exception:
+            logger.exception("No se pudo actualizar el resumen del usuario %s", user_id)
+        finally:
+            self._en_curso.discard(user_id)
@@ -0,0 +1,18 @@
+import os
+import sys
+
+# Los módulos del asistente se importan como asistente_restaurante.<módulo>
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# app.py crea el cliente de Azure OpenAI al importarse; las pruebas nunca lo usan
+os.environ.setdefault("AZURE_OPENAI_API_VERSION", "2024-06-01")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+os.environ.setdefault("AZURE_OPENAI_KEY", "test")
+os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT", "test")
+
+try:
+    import psycopg2  # noqa: F401
+    import openai  # noqa: F401
+except ImportError:
+    # Sin las dependencias del asistente (requirements.txt) no hay nada que probar
+    collect_ignore_glob = ["test_*.py"]
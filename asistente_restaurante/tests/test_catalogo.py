@@ -0,0 +1,86 @@
+from contextlib import nullcontext
+import threading
+import time
+
+from asistente_restaurante.catalogo import CatalogCache
+
+RESTAURANTE = {"name": "Mar", "location": "Centro", "rating": 4.5, "description": "Pescados"}
+PLATO = {
+    "id": 1, "name": "Mojarra", "price_cop": 30000, "restaurant": "Mar", "rating": 4.0,
+    "description": "Frita", "ingredients": "mojarra, limón", "health_benefits": "proteína",
+    "main_protein": "pescado",
+}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        # La consulta nunca debe correr con el lock global tomado
+        assert not self.conn.cache._lock.locked()
+        self.conn.queries.append(sql)
+        self.rows = [RESTAURANTE] if "restaurant" in sql and "dishes" not in sql else [PLATO]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConn:
+    def __init__(self, cache):
+        self.cache = cache
+        self.queries = []
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+
+def test_queries_run_outside_the_lock_and_are_cached():
+    cache = CatalogCache(ttl_seconds=60)
+    conn = FakeConn(cache)
+    menu = cache.get_menu(conn, ["diabetes"])
+    assert cache.get_menu(conn, ["diabetes"]) is menu
+    assert "Mar" in cache.get_restaurantes(conn)
+    assert len(conn.queries) == 2
+
+
+def test_ttl_reload_bumps_version():
+    cache = CatalogCache(ttl_seconds=60)
+    conn = FakeConn(cache)
+    cache.get_restaurantes(conn)
+    first = cache.version
+    cache._expires_at = time.monotonic() - 1
+    cache.get_restaurantes(conn)
+    assert cache.version > first
+
+
+def test_invalidate_bumps_version_and_drops_menus():
+    cache = CatalogCache(ttl_seconds=60)
+    conn = FakeConn(cache)
+    menu = cache.get_menu(conn, ["diabetes"])
+    version = cache.version
+    cache.invalidate()
+    assert cache.version > version
+    assert cache.get_menu(conn, ["diabetes"]) is not menu
+
+
+def test_stale_menu_is_served_while_rebuilt_in_background():
+    cache = CatalogCache(ttl_seconds=60)
+    conn = FakeConn(cache)
+    cache.get_connection = lambda: nullcontext(FakeConn(cache))
+    stale = cache.get_menu(conn, ["diabetes"])
+    cache.invalidate()
+
+    assert cache.get_menu(conn, ["diabetes"]) is stale
+    for hilo in threading.enumerate():
+        if hilo.name == "menu-rebuild":
+            hilo.join(5)
+    fresh = cache.get_menu(conn, ["diabetes"])
+    assert fresh is not stale
+    assert fresh.version == cache.version
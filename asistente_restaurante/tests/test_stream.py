@@ -0,0 +1,132 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from asistente_restaurante import app
+
+
+def chunk(content=None, choices=True):
+    if not choices:
+        return SimpleNamespace(choices=[])
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class FakeStream:
+    """Imita el AsyncStream de openai: iterable asíncrono con close()"""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for c in self.chunks:
+            yield c
+        if self.error is not None:
+            raise self.error
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, stream):
+        self.stream = stream
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self.stream
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    guardados, cacheados = [], []
+    monkeypatch.setattr(app, "guardar_conversacion", lambda *args: guardados.append(args))
+    monkeypatch.setattr(app, "guardar_en_cache", lambda *args: cacheados.append(args))
+
+    def instalar(stream):
+        client = FakeClient(stream)
+        monkeypatch.setattr(app, "client", client)
+        return client
+
+    return SimpleNamespace(instalar=instalar, guardados=guardados, cacheados=cacheados)
+
+
+def parse(evento):
+    """(event, data) de un evento SSE; event es None para los mensajes sin nombre"""
+    assert evento.endswith("\n\n")
+    nombre = None
+    lineas = evento[:-2].split("\n")
+    if lineas[0].startswith("event: "):
+        nombre = lineas.pop(0)[len("event: "):]
+    assert len(lineas) == 1 and lineas[0].startswith("data: ")
+    return nombre, json.loads(lineas[0][len("data: "):])
+
+
+async def consumir(generador):
+    return [evento async for evento in generador]
+
+
+def test_stream_frames_deltas_and_final_event(fake_llm):
+    stream = FakeStream([chunk("Hola"), chunk(choices=False), chunk(None), chunk(" Ana, ñam")])
+    client = fake_llm.instalar(stream)
+    cache_info = (["diabetes"], 3)
+
+    eventos = asyncio.run(consumir(app.stream_respuesta(7, "hola", [{"role": "user", "content": "hola"}], cache_info)))
+
+    assert [parse(e) for e in eventos] == [
+        (None, {"delta": "Hola"}),
+        (None, {"delta": " Ana, ñam"}),
+        ("done", {"response": "Hola Ana, ñam"}),
+    ]
+    assert "ñam" in eventos[1]  # ensure_ascii=False
+    assert client.requests[0]["stream"] is True
+    assert fake_llm.guardados == [(7, "hola", "Hola Ana, ñam")]
+    assert fake_llm.cacheados == [("hola", cache_info, "Hola Ana, ñam")]
+
+
+def test_stream_error_ends_with_error_event_and_saves_nothing(fake_llm):
+    fake_llm.instalar(FakeStream([chunk("Hola")], error=RuntimeError("sin cuota")))
+
+    eventos = asyncio.run(consumir(app.stream_respuesta(7, "hola", [])))
+
+    assert [parse(e) for e in eventos] == [
+        (None, {"delta": "Hola"}),
+        ("error", {"error": "sin cuota"}),
+    ]
+    assert fake_llm.guardados == [] and fake_llm.cacheados == []
+
+
+def test_client_disconnect_closes_upstream_and_saves_nothing(fake_llm):
+    stream = FakeStream([chunk("Hola"), chunk(" mundo")])
+    fake_llm.instalar(stream)
+
+    async def desconectar():
+        generador = app.stream_respuesta(7, "hola", [])
+        primero = await generador.__anext__()
+        # StreamingResponse cierra el generador cuando el cliente se va
+        await generador.aclose()
+        return primero
+
+    assert parse(asyncio.run(desconectar())) == (None, {"delta": "Hola"})
+    assert stream.closed
+    assert fake_llm.guardados == []
+
+
+def test_respuesta_sse_sends_delta_then_done():
+    async def cuerpo():
+        respuesta = app.respuesta_sse("Solo alimentación")
+        return [parte async for parte in respuesta.body_iterator]
+
+    eventos = asyncio.run(cuerpo())
+    assert [parse(e) for e in eventos] == [
+        (None, {"delta": "Solo alimentación"}),
+        ("done", {"response": "Solo alimentación"}),
+    ]
@@ -0,0 +1,60 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.db.session import SQLALCHEMY_DATABASE_URL, Base
+import app.models.calification  # noqa: F401 (registrar los modelos en Base.metadata)
+import app.models.calification_stats  # noqa: F401
+import app.models.chat_message  # noqa: F401
+import app.models.chat_summary  # noqa: F401
+import app.models.diabetes_type  # noqa: F401
+import app.models.dish  # noqa: F401
+import app.models.glucometer_usage  # noqa: F401
+import app.models.glucose_measurement  # noqa: F401
+import app.models.insurance  # noqa: F401
+import app.models.medical_recommendation  # noqa: F401
+import app.models.notification  # noqa: F401
+import app.models.patient  # noqa: F401
+import app.models.rating  # noqa: F401
+import app.models.restaurant  # noqa: F401
+import app.models.revoked_token  # noqa: F401
+import app.models.tour_stop  # noqa: F401
+import app.models.user  # noqa: F401
+
+config = context.config
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL)
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,56 @@
+"""dishes: columna conditions (varchar[]) con índice GIN, derivada de category
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+
+revision = "0000"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Copia congelada de crud.dish.CATEGORY_KEYWORDS al crear esta revisión: la
+# migración no importa código de la aplicación y su resultado no cambia si el
+# mapa se edita después
+CATEGORY_KEYWORDS = {
+    "diabetes": ("diabetes",),
+    "hypertension": ("hipertensión", "hipertension"),
+    "obesity": ("obesidad",),
+}
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("dishes")}
+    if "conditions" not in columns:
+        op.add_column(
+            "dishes",
+            sa.Column("conditions", ARRAY(sa.String()), nullable=False, server_default="{}")
+        )
+
+    # Mismas reglas que crud.dish.conditions_from_category, sin repetir etiquetas (idempotente)
+    for condition, keywords in CATEGORY_KEYWORDS.items():
+        op.execute(
+            sa.text(
+                "UPDATE dishes SET conditions = array_append(conditions, CAST(:condition AS varchar)) "
+                "WHERE lower(coalesce(category, '')) LIKE ANY(:patterns) "
+                "AND NOT (conditions @> ARRAY[CAST(:condition AS varchar)])"
+            ).bindparams(condition=condition, patterns=[f"%{keyword}%" for keyword in keywords])
+        )
+
+    # CONCURRENTLY no bloquea las escrituras, pero no puede ir en una transacción
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dishes_conditions "
+            "ON dishes USING gin (conditions)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_dishes_conditions")
+    op.drop_column("dishes", "conditions")
@@ -0,0 +1,27 @@
+"""chat_messages: índice (user_id, timestamp DESC, id DESC) para el historial
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = "0000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY no bloquea las escrituras en tablas grandes, pero no puede ir en una transacción
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chat_messages_user_id_timestamp "
+            "ON chat_messages (user_id, timestamp DESC, id DESC)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chat_messages_user_id_timestamp")
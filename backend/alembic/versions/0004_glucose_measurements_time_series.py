@@ -0,0 +1,53 @@
+"""glucose_measurements: columna measured_at e índices de serie de tiempo
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# Valor de GLUCOSE_TIMEZONE al crear esta revisión, congelado: el relleno de
+# measured_at no depende del entorno en que corra la migración
+GLUCOSE_TIMEZONE = "America/Bogota"
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("glucose_measurements")}
+    if "measured_at" not in columns:
+        op.add_column(
+            "glucose_measurements",
+            sa.Column("measured_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        # Las lecturas existentes solo tienen fecha: se ubican al inicio de ese día
+        op.execute(
+            sa.text(
+                "UPDATE glucose_measurements "
+                "SET measured_at = measurement_date::timestamp AT TIME ZONE :tz "
+                "WHERE measurement_date IS NOT NULL"
+            ).bindparams(tz=GLUCOSE_TIMEZONE)
+        )
+        op.alter_column("glucose_measurements", "measured_at", nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_glucose_measurements_patient_id_measured_at "
+            "ON glucose_measurements (patient_id, measured_at, id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_glucose_measurements_measured_at_brin "
+            "ON glucose_measurements USING brin (measured_at)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_glucose_measurements_measured_at_brin")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_glucose_measurements_patient_id_measured_at")
+    op.drop_column("glucose_measurements", "measured_at")
@@ -0,0 +1,39 @@
+"""medication_alarms: next_alarm_time con zona horaria e indexado para el scheduler
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"]: c for c in sa.inspect(op.get_bind()).get_columns("medication_alarms")}
+    if not getattr(columns["next_alarm_time"]["type"], "timezone", False):
+        # Los valores se guardaron convertidos a la zona horaria de la sesión
+        op.execute(
+            "ALTER TABLE medication_alarms ALTER COLUMN next_alarm_time TYPE timestamptz "
+            "USING next_alarm_time AT TIME ZONE current_setting('TimeZone')"
+        )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_medication_alarms_next_alarm_time "
+            "ON medication_alarms (next_alarm_time)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_medication_alarms_next_alarm_time")
+    op.execute(
+        "ALTER TABLE medication_alarms ALTER COLUMN next_alarm_time TYPE timestamp "
+        "USING next_alarm_time AT TIME ZONE current_setting('TimeZone')"
+    )
@@ -0,0 +1,48 @@
+"""calification_stats: contadores de calificaciones (total, suma e histograma 1-5)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+SHARDS = 16
+
+
+def upgrade():
+    # create_all puede haber creado ya la tabla (vacía o con contadores parciales)
+    if not sa.inspect(op.get_bind()).has_table("calification_stats"):
+        counter = lambda name: sa.Column(name, sa.BigInteger(), nullable=False, server_default="0")
+        op.create_table(
+            "calification_stats",
+            sa.Column("shard", sa.Integer(), primary_key=True),
+            counter("count"),
+            counter("sum"),
+            *[counter(f"rating_{rating}") for rating in range(1, 6)],
+        )
+
+    # Recalcular desde cero; el bloqueo impide inserciones mientras tanto
+    op.execute("LOCK TABLE califications IN SHARE MODE")
+    op.execute("DELETE FROM calification_stats")
+    op.execute(f"""
+        INSERT INTO calification_stats (shard, count, sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+        SELECT user_id % {SHARDS}, count(*), sum(rating),
+               count(*) FILTER (WHERE rating = 1),
+               count(*) FILTER (WHERE rating = 2),
+               count(*) FILTER (WHERE rating = 3),
+               count(*) FILTER (WHERE rating = 4),
+               count(*) FILTER (WHERE rating = 5)
+        FROM califications
+        GROUP BY user_id % {SHARDS}
+    """)
+
+
+def downgrade():
+    op.drop_table("calification_stats")
@@ -0,0 +1,65 @@
+"""dish_ratings / restaurant_ratings: votos y totales acumulados de puntuación
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# Valor de RATING_PRIOR_MEAN al crear esta revisión, congelado: las puntuaciones
+# rellenadas no cambian con la configuración del entorno
+RATING_PRIOR_MEAN = 3.0
+
+# (tabla de votos, columna del elemento, tabla del elemento, índice por puntuación)
+TARGETS = [
+    ("dish_ratings", "dish_id", "dishes", "ix_dishes_rating_id"),
+    ("restaurant_ratings", "restaurant_id", "restaurant", "ix_restaurant_rating_id"),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for votes, item_column, items, index in TARGETS:
+        columns = {c["name"] for c in inspector.get_columns(items)}
+        if "rating_prior" not in columns:
+            op.add_column(items, sa.Column("rating_prior", sa.Float(), nullable=True))
+            op.add_column(items, sa.Column("rating_count", sa.Integer(), nullable=False, server_default="0"))
+            op.add_column(items, sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"))
+            # La puntuación del catálogo pasa a ser el punto de partida del promedio
+            op.execute(
+                sa.text(
+                    f"UPDATE {items} SET rating_prior = rating, rating = coalesce(rating, :prior_mean)"
+                ).bindparams(prior_mean=RATING_PRIOR_MEAN)
+            )
+
+        if not inspector.has_table(votes):
+            op.create_table(
+                votes,
+                sa.Column(item_column, sa.Integer(), sa.ForeignKey(f"{items}.id", ondelete="CASCADE"), primary_key=True),
+                sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+                sa.Column("rating", sa.SmallInteger(), nullable=False),
+                sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            )
+
+    with op.get_context().autocommit_block():
+        for votes, item_column, items, index in TARGETS:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {items} (rating, id)")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for votes, item_column, items, index in TARGETS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+    for votes, item_column, items, index in TARGETS:
+        op.drop_table(votes)
+        op.execute(f"UPDATE {items} SET rating = rating_prior")
+        op.drop_column(items, "rating_sum")
+        op.drop_column(items, "rating_count")
+        op.drop_column(items, "rating_prior")
@@ -0,0 +1,49 @@
+"""dishes: columna tsvector generada (español) e índices para /dishes/search
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('spanish', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(ingredients, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('spanish', coalesce(health_benefits, '')), 'C')"
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("dishes")}
+    if "search_vector" not in columns:
+        # Reescribe la tabla una vez para calcular la columna en las filas existentes
+        op.execute(
+            f"ALTER TABLE dishes ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+        )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dishes_search_vector "
+            "ON dishes USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dishes_name_trgm "
+            "ON dishes USING gin (name gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_dishes_name_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_dishes_search_vector")
+    op.drop_column("dishes", "search_vector")
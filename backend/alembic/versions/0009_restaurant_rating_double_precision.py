@@ -0,0 +1,29 @@
+"""restaurant.rating: real -> double precision (mismo tipo que dishes.rating)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"]: c for c in sa.inspect(op.get_bind()).get_columns("restaurant")}
+    if not isinstance(columns["rating"]["type"], sa.Double):
+        # float4 no conserva el promedio exacto que viaja en el cursor de rating
+        # (pasar por numeric evita arrastrar el error de redondeo de real: 4.3, no 4.300000190734863)
+        op.alter_column(
+            "restaurant", "rating", type_=sa.Float(), existing_nullable=True,
+            postgresql_using="rating::numeric::double precision"
+        )
+
+
+def downgrade():
+    op.alter_column("restaurant", "rating", type_=sa.Float(precision=2), existing_nullable=True)
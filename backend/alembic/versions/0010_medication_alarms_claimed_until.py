@@ -0,0 +1,27 @@
+"""medication_alarms: columna claimed_until (alarmas reclamadas por el scheduler)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("medication_alarms")}
+    if "claimed_until" not in columns:
+        op.add_column(
+            "medication_alarms",
+            sa.Column("claimed_until", sa.DateTime(timezone=True), nullable=True),
+        )
+
+
+def downgrade():
+    op.drop_column("medication_alarms", "claimed_until")
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from app.core.security import create_access_token, verify_password, add_to_blacklist, oauth2_scheme
+from app.core.security import create_access_token, revoke_token, oauth2_scheme, get_current_user
+from app.core.hashing import hashing_stats, verify_and_update_password
+from app.models.user import User
 from app.core.config import settings
 from app.db.session import get_db
 from app.schemas.user import Token, UserLogin, UserCreate, UserInDB
-from app.crud.user import get_user_by_email, create_user
+from app.crud.user import get_user_by_email, create_user, user_snapshot, update_password_hash
+from app.core.cache import user_cache
 from app.crud.medical import create_medical_profile
 from app.db.session import get_db
 
@@ -17,15 +20,23 @@ def login(
     db: Session = Depends(get_db)
 ):
     user = get_user_by_email(db, email=form_data.email)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Si el email no existe se verifica igual contra un hash ficticio (mismo costo de CPU)
+    valid, new_hash = verify_and_update_password(
+        form_data.password, user.hashed_password if user else None
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        update_password_hash(db, user, new_hash)
+    # El usuario ya está cargado: se deja en caché para las siguientes peticiones autenticadas
+    user_cache.set(user.id, user_snapshot(user))
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -35,25 +46,32 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    # Crear usuario básico
-    created_user = create_user(db=db, user=user)
+    # Usuario y perfil médico se guardan en una sola transacción: si el perfil
+    # falla, el rollback no deja filas parciales
+    created_user = create_user(db=db, user=user, commit=False)
     
     # Si es diabético, crear perfil médicos
     if user.diabetes and user.medical_profile:
         try:
-            create_medical_profile(db, user_id=created_user.id, profile=user.medical_profile)
+            create_medical_profile(db, user_id=created_user.id, profile=user.medical_profile, commit=False)
         except Exception as e:
-            # En caso de error, eliminar el usuario creado
-            db.delete(created_user)
-            db.commit()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating medical profile: {str(e)}"
             )
+    db.commit()
+    db.refresh(created_user)
     
     return created_user
 
 @router.post("/logout")
-async def logout(token: str = Depends(oauth2_scheme)):
-    add_to_blacklist(token)
-    return {"message": "Successfully logged out"}
\ No newline at end of file
+def logout(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    revoke_token(token, db)
+    return {"message": "Successfully logged out"}
+
+@router.get("/hashing/stats")
+def read_hashing_stats(current_user: User = Depends(get_current_user)):
+    """Métricas del pool de hashing de contraseñas (solo administradores)"""
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
+    return hashing_stats()
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.db.session import get_db
-from app.schemas.calification import Calification, CalificationCreate, CalificationList
-from app.crud.calification import create_calification, get_califications, get_calification, get_califications_by_user
+from app.schemas.calification import Calification, CalificationCreate, CalificationList, CalificationStats
+from app.crud.calification import create_calification, get_califications, count_califications, get_calification, get_califications_by_user, get_calification_stats
+from app.core.pagination import set_pagination_headers
 from app.core.security import get_current_user
 from app.models.user import User
 
@@ -26,8 +27,25 @@ def create_calification_endpoint(
     return create_calification(db, calification)
 
 @router.get("/califications", response_model=List[Calification])
-def read_califications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_califications(db, skip=skip, limit=limit)
+def read_califications(
+    response: Response,
+    limit: int = Query(100, gt=0, le=1000, description="Elementos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor"),
+    exact_total: bool = Query(False, description="Contar el total exacto (más lento en tablas grandes)"),
+    skip: int = Query(0, ge=0, deprecated=True, description="OFFSET; usar cursor"),
+    db: Session = Depends(get_db)
+):
+    try:
+        califications, next_cursor = get_califications(db, limit=limit, cursor=cursor, skip=skip)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    total, exact = count_califications(db, exact=exact_total)
+    set_pagination_headers(response, next_cursor, total, exact)
+    return califications
+
+@router.get("/califications/stats", response_model=CalificationStats)
+def read_calification_stats(db: Session = Depends(get_db)):
+    return get_calification_stats(db)
 
 @router.get("/califications/{calification_id}", response_model=Calification)
 def read_calification(calification_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.db.session import get_db
+from app.schemas.chat_message import ChatHistory
+from app.crud.chat_message import get_chat_messages_by_user
+from app.core.security import get_current_user
+from app.models.user import User
+
+router = APIRouter(tags=["Chat"])
+
+@router.get("/chat/history", response_model=ChatHistory)
+def read_chat_history(
+    limit: int = Query(20, gt=0, le=100, description="Mensajes por página"),
+    before: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        messages, next_cursor = get_chat_messages_by_user(db, current_user.id, limit=limit, cursor=before)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return {"messages": messages, "next_cursor": next_cursor}
@@ -1,16 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
 from app.db.session import get_db
-from app.schemas.dish import Dish, DishCreate
-from app.crud.dish import get_dishes, create_dish, get_dish
+from app.schemas.dish import Dish, DishCreate, DishCondition
+from app.crud.dish import get_dishes, count_dishes, create_dish, get_dish, get_dishes_for_conditions, search_dishes
+from app.core.pagination import set_pagination_headers
+from app.core.ratings import rating_writer
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.rating import RatingCreate
 
 router = APIRouter(tags=["Platos"])
 
 @router.get("/dishes", response_model=List[Dish])
-def read_dishes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    dishes = get_dishes(db, skip=skip, limit=limit)
+def read_dishes(
+    response: Response,
+    limit: int = Query(100, gt=0, le=1000, description="Elementos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor"),
+    exact_total: bool = Query(False, description="Contar el total exacto (más lento en tablas grandes)"),
+    skip: int = Query(0, ge=0, deprecated=True, description="OFFSET; usar cursor"),
+    sort: Literal["id", "rating"] = Query("id", description="Orden: id o mejor puntuación primero"),
+    db: Session = Depends(get_db)
+):
+    try:
+        dishes, next_cursor = get_dishes(db, limit=limit, cursor=cursor, skip=skip, sort=sort)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    total, exact = count_dishes(db, exact=exact_total)
+    set_pagination_headers(response, next_cursor, total, exact)
+    return dishes
+
+@router.get("/dishes/search", response_model=List[Dish])
+def search_dishes_endpoint(
+    q: str = Query(..., min_length=2, max_length=200, description="Texto a buscar"),
+    limit: int = Query(20, gt=0, le=100),
+    min_price: Optional[float] = Query(None, ge=0, description="Precio mínimo (COP)"),
+    max_price: Optional[float] = Query(None, ge=0, description="Precio máximo (COP)"),
+    restaurant_id: Optional[int] = None,
+    protein: Optional[str] = Query(None, description="Proteína principal"),
+    db: Session = Depends(get_db)
+):
+    return search_dishes(
+        db, q, limit=limit, min_price=min_price, max_price=max_price,
+        restaurant_id=restaurant_id, protein=protein
+    )
+
+@router.get("/dishes/by-conditions", response_model=List[Dish])
+def read_dishes_for_conditions(
+    response: Response,
+    conditions: List[DishCondition] = Query([], description="Condiciones que el plato debe cubrir"),
+    limit: int = Query(100, gt=0, le=1000, description="Elementos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor"),
+    skip: int = Query(0, ge=0, deprecated=True, description="OFFSET; usar cursor"),
+    db: Session = Depends(get_db)
+):
+    try:
+        dishes, next_cursor = get_dishes_for_conditions(
+            db, conditions=list(set(conditions)), limit=limit, cursor=cursor, skip=skip
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    # Sin X-Total-Count: el estimado de pg_class sería el de todos los platos, no el del filtro
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return dishes
 
 @router.get("/dishes/{dish_id}", response_model=Dish)
@@ -22,4 +75,17 @@ def read_dish(dish_id: int, db: Session = Depends(get_db)):
 
 @router.post("/dishes", response_model=Dish)
 def create_new_dish(dish: DishCreate, db: Session = Depends(get_db)):
-    return create_dish(db=db, dish=dish)
\ No newline at end of file
+    return create_dish(db=db, dish=dish)
+
+@router.post("/dishes/{dish_id}/ratings", status_code=status.HTTP_202_ACCEPTED)
+def rate_dish(
+    dish_id: int,
+    vote: RatingCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # El voto se aplica en el siguiente lote (rating_count/rating_sum y el promedio)
+    if get_dish(db, dish_id=dish_id) is None:
+        raise HTTPException(status_code=404, detail="Plato no encontrado")
+    rating_writer.enqueue("dish", dish_id, current_user.id, vote.rating)
+    return {"message": "Puntuación recibida"}
@@ -1,21 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 from app.db.session import get_db
 from app.schemas.medical import MedicalProfileCreate, MedicalProfileResponse
-from app.crud.medical import create_medical_profile
+from app.schemas.glucose_measurement import (
+    GlucoseReadingPage, GlucoseBulkResult, GlucoseStats, GlucosePeriod
+)
+from app.crud.medical import create_medical_profile, get_medical_profile
+from app.crud.patient import get_patient
+from app.crud.glucose_measurement import (
+    get_glucose_measurements_by_patient, get_glucose_measurements_version, get_glucose_stats, localize
+)
+from app.core.glucose_ingest import BULK_FORMATS, ingest_glucose_stream
+from fastapi.concurrency import run_in_threadpool
 from app.core.security import get_current_user
 from app.models.user import User
-from app.models.patient import Patient
-from app.models.diabetes_type import DiabetesType
-from app.models.insurance import Insurance
-from app.models.glucometer_usage import GlucometerUsage
-from app.models.glucose_measurement import GlucoseMeasurement
+import hashlib
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Un entity-tag de If-None-Match: "*" o "..." con prefijo W/ opcional
+ENTITY_TAG = re.compile(r'\*|(?:W/)?"[^"]*"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara el ETag con la lista de If-None-Match (separada por comas) con la
+    comparación débil de RFC 9110: W/"x" y "x" son iguales; "*" coincide siempre.
+    """
+    if not if_none_match:
+        return False
+    for tag in ENTITY_TAG.findall(if_none_match):
+        if tag == "*" or tag.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
 @router.post("/profile", status_code=status.HTTP_201_CREATED)
 def create_medical_profile_endpoint(
     profile: MedicalProfileCreate,
@@ -35,12 +59,14 @@ def create_medical_profile_endpoint(
 
 
 @router.get("/profile", response_model=MedicalProfileResponse)
-def get_medical_profile(
+def get_medical_profile_endpoint(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Obtener paciente asociado al usuario
-    patient = db.query(Patient).filter(Patient.id == current_user.id).first()
+    # Obtener paciente con su perfil; las mediciones se leen solo si hacen falta
+    patient = get_medical_profile(db, patient_id=current_user.id, with_measurements=False)
     
     if not patient:
         raise HTTPException(
@@ -48,14 +74,8 @@ def get_medical_profile(
             detail="Perfil médico no encontrado"
         )
     
-    # Obtener datos relacionados
-    diabetes_type = db.query(DiabetesType).filter(DiabetesType.id == patient.diabetes_type_id).first()
-    insurance = db.query(Insurance).filter(Insurance.id == patient.insurance_id).first()
-    glucometer_usage = db.query(GlucometerUsage).filter(GlucometerUsage.patient_id == patient.id).first()
-    glucose_measurements = db.query(GlucoseMeasurement).filter(GlucoseMeasurement.patient_id == patient.id).all()
-    
     # Construir respuesta estructurada
-    return {
+    fields = {
         "document_number": patient.document_number,
         "document_type": patient.document_type,
         "city": patient.city,
@@ -67,8 +87,87 @@ def get_medical_profile(
         "diagnosis_date": patient.diagnosis_date,
         "doctor_name": patient.doctor_name,
         "doctor_phone": patient.doctor_phone,
-        "diabetes_type": diabetes_type,
-        "insurance": insurance,
-        "glucometer_usage": glucometer_usage,
-        "glucose_measurements": glucose_measurements
-    }
\ No newline at end of file
+        "diabetes_type": patient.diabetes_type,
+        "insurance": patient.insurance,
+        "glucometer_usage": patient.glucometer_usage,
+    }
+
+    # ETag del perfil sin mediciones más la versión de las mediciones (cantidad e id
+    # máximo): si el cliente ya tiene esta versión se responde 304 sin leerlas
+    summary = MedicalProfileResponse.model_validate(fields, from_attributes=True)
+    count, max_id = get_glucose_measurements_version(db, patient.id)
+    version = f"{summary.model_dump_json()}|{count}|{max_id}"
+    etag = '"' + hashlib.sha256(version.encode()).hexdigest()[:32] + '"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return MedicalProfileResponse.model_validate(
+        {**fields, "glucose_measurements": patient.glucose_measurements}, from_attributes=True
+    )
+
+
+def get_patient_id(db: Session, user: User) -> int:
+    # Las lecturas de glucosa cuelgan del perfil médico del usuario
+    if not get_patient(db, user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil médico no encontrado"
+        )
+    return user.id
+
+
+@router.post("/measurements:bulk", response_model=GlucoseBulkResult)
+async def bulk_upload_glucose_readings(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Carga de exportaciones del glucómetro en CSV (measured_at,level_measured) o
+    NDJSON. El cuerpo se procesa a medida que llega y se guarda con COPY por bloques.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = BULK_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Formato no soportado: usa text/csv o application/x-ndjson"
+        )
+    patient_id = await run_in_threadpool(get_patient_id, db, current_user)
+    return await ingest_glucose_stream(db, patient_id, request.stream(), fmt)
+
+
+@router.get("/measurements", response_model=GlucoseReadingPage)
+def read_glucose_readings(
+    start: Optional[datetime] = Query(None, description="Desde (incluido)"),
+    end: Optional[datetime] = Query(None, description="Hasta (excluido)"),
+    limit: int = Query(100, gt=0, le=1000, description="Lecturas por página"),
+    before: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    patient_id = get_patient_id(db, current_user)
+    try:
+        readings, next_cursor = get_glucose_measurements_by_patient(
+            db, patient_id, limit=limit, cursor=before, start=localize(start), end=localize(end)
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return {"readings": readings, "next_cursor": next_cursor}
+
+
+@router.get("/measurements/stats", response_model=List[GlucoseStats])
+def read_glucose_stats(
+    period: GlucosePeriod = Query("day", description="Agrupar por día o semana"),
+    start: Optional[datetime] = Query(None, description="Desde (por defecto, 90 días antes de end)"),
+    end: Optional[datetime] = Query(None, description="Hasta (por defecto, ahora)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Tendencia de glucosa: mínimo, máximo, promedio y tiempo en rango por periodo"""
+    patient_id = get_patient_id(db, current_user)
+    end = localize(end) or datetime.now(timezone.utc)
+    start = localize(start) or end - timedelta(days=90)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="El rango de fechas no es válido")
+    return get_glucose_stats(db, patient_id, period, start, end)
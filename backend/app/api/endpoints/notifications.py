@@ -5,7 +5,8 @@ from app.schemas.notification import MedicationAlarmCreate, MedicationAlarm, Med
 from app.crud.notification import (
     create_medication_alarm,
     get_medication_alarms_by_user,
-    delete_medication_alarm
+    delete_medication_alarm,
+    recompute_next_alarm_times
 )
 from app.core.security import get_current_user
 from app.models.user import User
@@ -28,6 +29,18 @@ def get_alarms(
     alarms = get_medication_alarms_by_user(db, current_user.id)
     return {"alarms": alarms}  # ← Solo devuelve las alarmas, sin recalcular
 
+@router.post("/alarms/recompute")
+def recompute_alarms(
+    all_users: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recalcula la próxima toma de las alarmas del usuario (o de todos, solo administradores)"""
+    if all_users and not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
+    updated = recompute_next_alarm_times(db, None if all_users else current_user.id)
+    return {"updated": updated}
+
 @router.delete("/alarms/{alarm_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_alarm(
     alarm_id: int,
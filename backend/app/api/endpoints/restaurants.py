@@ -1,16 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
 from app.db.session import get_db
 from app.schemas.restaurant import Restaurant, RestaurantCreate
-from app.crud.restaurant import get_restaurants, create_restaurant, get_restaurant
+from app.crud.restaurant import get_restaurants, count_restaurants, create_restaurant, get_restaurant
+from app.core.pagination import set_pagination_headers
+from app.core.ratings import rating_writer
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.rating import RatingCreate
 
 router = APIRouter(tags=["Restaurantes"])
 
 @router.get("/restaurants", response_model=List[Restaurant])
-def read_restaurants(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    restaurants = get_restaurants(db, skip=skip, limit=limit)
+def read_restaurants(
+    response: Response,
+    limit: int = Query(100, gt=0, le=1000, description="Elementos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor"),
+    exact_total: bool = Query(False, description="Contar el total exacto (más lento en tablas grandes)"),
+    skip: int = Query(0, ge=0, deprecated=True, description="OFFSET; usar cursor"),
+    sort: Literal["id", "rating"] = Query("id", description="Orden: id o mejor puntuación primero"),
+    db: Session = Depends(get_db)
+):
+    try:
+        restaurants, next_cursor = get_restaurants(db, limit=limit, cursor=cursor, skip=skip, sort=sort)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    total, exact = count_restaurants(db, exact=exact_total)
+    set_pagination_headers(response, next_cursor, total, exact)
     return restaurants
 
 @router.get("/restaurants/{restaurant_id}", response_model=Restaurant)
@@ -22,4 +40,17 @@ def read_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
 
 @router.post("/restaurants", response_model=Restaurant)
 def create_new_restaurant(restaurant: RestaurantCreate, db: Session = Depends(get_db)):
-    return create_restaurant(db=db, restaurant=restaurant)
\ No newline at end of file
+    return create_restaurant(db=db, restaurant=restaurant)
+
+@router.post("/restaurants/{restaurant_id}/ratings", status_code=status.HTTP_202_ACCEPTED)
+def rate_restaurant(
+    restaurant_id: int,
+    vote: RatingCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # El voto se aplica en el siguiente lote (rating_count/rating_sum y el promedio)
+    if get_restaurant(db, restaurant_id=restaurant_id) is None:
+        raise HTTPException(status_code=404, detail="Restaurante no encontrado")
+    rating_writer.enqueue("restaurant", restaurant_id, current_user.id, vote.rating)
+    return {"message": "Puntuación recibida"}
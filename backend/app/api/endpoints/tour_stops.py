@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.db.session import get_db
 from app.schemas.tour_stop import TourStop, TourStopCreate, TourRoute, TourStopList
-from app.crud.tour_stop import create_tour_stop, get_tour_stops, get_tour_stop, get_tour_route
+from app.crud.tour_stop import create_tour_stop, get_tour_stops, count_tour_stops, get_tour_stop, get_tour_route, get_all_routes
+from app.core.pagination import set_pagination_headers
 
 router = APIRouter(tags=["Tour Stops"])
 
@@ -16,8 +17,21 @@ def create_tour_stop_endpoint(
     return create_tour_stop(db, tour_stop)
 
 @router.get("/tour-stops", response_model=List[TourStop])
-def read_tour_stops(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_tour_stops(db, skip=skip, limit=limit)
+def read_tour_stops(
+    response: Response,
+    limit: int = Query(100, gt=0, le=1000, description="Elementos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor"),
+    exact_total: bool = Query(False, description="Contar el total exacto (más lento en tablas grandes)"),
+    skip: int = Query(0, ge=0, deprecated=True, description="OFFSET; usar cursor"),
+    db: Session = Depends(get_db)
+):
+    try:
+        tour_stops, next_cursor = get_tour_stops(db, limit=limit, cursor=cursor, skip=skip)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    total, exact = count_tour_stops(db, exact=exact_total)
+    set_pagination_headers(response, next_cursor, total, exact)
+    return tour_stops
 
 # Obtener una parada específica
 @router.get("/routes/{route_id}/stops/{stop_number}", response_model=TourStop)
@@ -47,18 +61,5 @@ def get_route(route_id: int, db: Session = Depends(get_db)):
 
 # Obtener todas las rutas disponibles
 @router.get("/routes", response_model=TourStopList)
-def get_all_routes(db: Session = Depends(get_db)):
-    # Obtener todos los IDs de rutas únicos
-    route_ids = [stop.id for stop in db.query(TourStop.id).distinct().all()]
-    
-    routes = []
-    for route_id in route_ids:
-        stops = get_tour_route(db, route_id)
-        if stops:
-            routes.append(TourRoute(
-                id=route_id,
-                route_name=stops[0].route_name,
-                stops=stops
-            ))
-    
-    return {"routes": routes}
\ No newline at end of file
+def read_all_routes(db: Session = Depends(get_db)):
+    return {"routes": get_all_routes(db)}
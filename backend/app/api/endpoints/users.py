@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.db.session import get_db
 from app.schemas.user import UserInDB, UserList
@@ -11,18 +11,23 @@ router = APIRouter()
 
 @router.get("/", response_model=UserList)
 def read_users(
-    page: int = Query(1, gt=0, description="Número de página"),
+    page: int = Query(1, gt=0, deprecated=True, description="Número de página (OFFSET; usar cursor)"),
     per_page: int = Query(10, gt=0, le=100, description="Elementos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor"),
+    exact_total: bool = Query(False, description="Contar el total exacto (más lento en tablas grandes)"),
     db: Session = Depends(get_db)
 ):
-    # Calcular el offset (saltar)
-    skip = (page - 1) * per_page
+    # Con cursor se pagina por id; `page` solo se mantiene para clientes viejos
+    skip = 0 if cursor else (page - 1) * per_page
     
     # Obtener usuarios paginados
-    users = get_users(db, skip=skip, limit=per_page)
+    try:
+        users, next_cursor = get_users(db, limit=per_page, cursor=cursor, skip=skip)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
     
-    # Obtener el total de usuarios
-    total = get_users_count(db)
+    # Total estimado (o exacto si se pide)
+    total, total_exact = get_users_count(db, exact=exact_total)
     
     # Calcular el total de páginas
     total_pages = (total + per_page - 1) // per_page
@@ -32,5 +37,7 @@ def read_users(
         "page": page,
         "per_page": per_page,
         "total": total,
-        "total_pages": total_pages
-    }
\ No newline at end of file
+        "total_pages": total_pages,
+        "total_exact": total_exact,
+        "next_cursor": next_cursor
+    }
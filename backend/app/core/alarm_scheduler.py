@@ -0,0 +1,196 @@
+# app/core/alarm_scheduler.py
+import heapq
+import importlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, text
+
+from app.core.config import settings
+from app.core.recurrence import NEXT_ALARM_TIME_SQL
+
+logger = logging.getLogger(__name__)
+
+# Próximas alarmas de todos los usuarios, en orden (usa ix_medication_alarms_next_alarm_time)
+UPCOMING_SQL = text("""
+    SELECT id, next_alarm_time FROM medication_alarms
+    WHERE next_alarm_time > :now AND next_alarm_time < :until
+    ORDER BY next_alarm_time
+    LIMIT :limit
+""")
+
+# Reclamar alarmas vencidas y reservarlas hasta :claimed_until. Las que otro
+# worker está reclamando se saltan en vez de esperar, y las ya reservadas no se
+# toman hasta que venza su reserva (si su notificación nunca se confirmó)
+CLAIM_SQL = text("""
+    UPDATE medication_alarms
+    SET claimed_until = :claimed_until
+    WHERE id IN (
+        SELECT id FROM medication_alarms
+        WHERE next_alarm_time <= now()
+          AND (claimed_until IS NULL OR claimed_until < now())
+        ORDER BY next_alarm_time
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, user_id, medication_name, dosage, frequency_hours, next_alarm_time
+""")
+
+# Ya notificadas: avanzar todas las alarmas del lote a su siguiente toma futura
+# en una sentencia (si el servicio estuvo detenido, las tomas perdidas no se
+# disparan una por una) y liberar la reserva
+ADVANCE_SQL = text(f"""
+    UPDATE medication_alarms
+    SET next_alarm_time = {NEXT_ALARM_TIME_SQL}, claimed_until = NULL
+    WHERE id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+# No se pudieron notificar: se liberan para reintentarlas después del backoff
+RELEASE_SQL = text("""
+    UPDATE medication_alarms SET claimed_until = NULL WHERE id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+
+class LogNotifier:
+    """Notificador por defecto: solo registra las alarmas en el log"""
+
+    def notify(self, alarms):
+        for alarm in alarms:
+            logger.info(
+                "Alarma %s: usuario %s debe tomar %s (%s)",
+                alarm["id"], alarm["user_id"], alarm["medication_name"], alarm["dosage"]
+            )
+
+
+def load_notifier(path: str):
+    """Instancia el notificador configurado como "paquete.modulo.Clase" """
+    module_name, _, class_name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class AlarmScheduler(threading.Thread):
+    """
+    Dispara las alarmas de medicamentos cuando vencen.
+
+    Mantiene en memoria un min-heap con las próximas alarmas (leídas con el
+    índice de next_alarm_time) para dormir justo hasta la siguiente. Al vencer,
+    reserva lotes (claimed_until) con FOR UPDATE SKIP LOCKED, así varios
+    procesos pueden correr el scheduler sin disparar dos veces la misma alarma.
+    La reserva se confirma antes de llamar al notificador, para que uno lento no
+    retenga los bloqueos de las filas; next_alarm_time solo avanza cuando la
+    notificación se entregó. Si el notificador falla, las alarmas se liberan y
+    se reintentan (al menos una entrega); si el proceso muere, se reintentan
+    cuando vence la reserva.
+    El heap es solo una pista: la base de datos decide qué está vencido.
+    Si algo falla, los reintentos se espacian con backoff exponencial.
+    """
+
+    def __init__(self, engine, notifier, batch_size: int = 500, heap_size: int = 10000,
+                 poll_seconds: float = 15.0, claim_seconds: float = 120.0,
+                 min_backoff_seconds: float = 1.0):
+        super().__init__(name="alarm-scheduler", daemon=True)
+        self.engine = engine
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.heap_size = heap_size
+        self.poll_seconds = poll_seconds
+        self.claim_seconds = claim_seconds
+        self.min_backoff_seconds = min_backoff_seconds
+        self.dispatched = 0
+        self._failures = 0
+        self._heap = []  # (next_alarm_time, id)
+        self._stop_event = threading.Event()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop_event.set()
+        self.join(timeout)
+
+    def _reload(self, now: datetime):
+        # Solo las alarmas que vencen antes del siguiente sondeo; las creadas en
+        # otros procesos entran al heap en la recarga siguiente
+        with self.engine.connect() as conn:
+            rows = conn.execute(UPCOMING_SQL, {
+                "now": now,
+                "until": now + timedelta(seconds=self.poll_seconds),
+                "limit": self.heap_size,
+            }).all()
+        self._heap = [(row.next_alarm_time, row.id) for row in rows]
+        heapq.heapify(self._heap)
+
+    def _claim_batch(self) -> int:
+        with self.engine.begin() as conn:
+            alarms = [dict(row._mapping) for row in conn.execute(CLAIM_SQL, {
+                "limit": self.batch_size,
+                "claimed_until": datetime.now(timezone.utc) + timedelta(seconds=self.claim_seconds),
+            })]
+        if not alarms:
+            return 0
+        ids = [alarm["id"] for alarm in alarms]
+        try:
+            self.notifier.notify(alarms)
+        except Exception:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(RELEASE_SQL, {"ids": ids})
+            except Exception:
+                # Sin liberar, se reintentan cuando vence la reserva
+                logger.exception("No se pudieron liberar %d alarmas reservadas", len(ids))
+            raise
+        with self.engine.begin() as conn:
+            conn.execute(ADVANCE_SQL, {
+                "ids": ids,
+                "now": datetime.now(timezone.utc),
+                "tz": settings.ALARM_TIMEZONE,
+            })
+        self.dispatched += len(alarms)
+        return len(alarms)
+
+    def dispatch_due(self) -> int:
+        """Dispara todas las alarmas vencidas, por lotes; devuelve cuántas se enviaron"""
+        total = 0
+        while True:
+            claimed = self._claim_batch()
+            total += claimed
+            if claimed < self.batch_size:
+                return total
+
+    def _backoff(self, now: datetime) -> datetime:
+        # Saca del heap lo que vence antes del reintento (se recarga de la base
+        # de datos) para que la alarma que falló no despierte el bucle de inmediato
+        self._failures += 1
+        delay = min(self.min_backoff_seconds * 2 ** (self._failures - 1), self.poll_seconds)
+        retry_at = now + timedelta(seconds=delay)
+        self._heap = [entry for entry in self._heap if entry[0] > retry_at]
+        heapq.heapify(self._heap)
+        return retry_at
+
+    def run(self):
+        next_reload = datetime.min.replace(tzinfo=timezone.utc)
+        while not self._stop_event.is_set():
+            now = datetime.now(timezone.utc)
+            try:
+                if now >= next_reload or (self._heap and self._heap[0][0] <= now):
+                    if self.dispatch_due():
+                        logger.debug("Alarmas disparadas: %d en total", self.dispatched)
+                    now = datetime.now(timezone.utc)
+                    self._reload(now)
+                    next_reload = now + timedelta(seconds=self.poll_seconds)
+                    self._failures = 0
+            except Exception:
+                logger.exception("Error en el scheduler de alarmas")
+                next_reload = self._backoff(datetime.now(timezone.utc))
+            # Dormir hasta la próxima alarma del heap o el siguiente sondeo
+            wake_at = min(self._heap[0][0], next_reload) if self._heap else next_reload
+            self._stop_event.wait(max((wake_at - datetime.now(timezone.utc)).total_seconds(), 0.05))
+
+
+def create_alarm_scheduler():
+    from app.db.session import engine
+    return AlarmScheduler(
+        engine,
+        load_notifier(settings.ALARM_NOTIFIER),
+        batch_size=settings.ALARM_BATCH_SIZE,
+        poll_seconds=settings.ALARM_POLL_SECONDS,
+        claim_seconds=settings.ALARM_CLAIM_SECONDS,
+    )
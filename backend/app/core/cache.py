@@ -0,0 +1,54 @@
+# app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """Caché LRU en memoria del proceso con vencimiento por entrada"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # clave -> (valor, vence_en)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Columnas de usuarios activos por id, para autenticar sin consultar la base en cada petición.
+# Cada worker tiene la suya: los cambios hechos en otro worker se ven al vencer el TTL.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+# Totales de los listados (COUNT(*) reciente por tabla); ver app/core/pagination.count_total
+count_cache = TTLCache(maxsize=256, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+# Catálogo completo de rutas (GET /routes). create_tour_stop la vacía en este worker;
+# en los demás el cambio se ve al vencer el TTL.
+routes_cache = TTLCache(maxsize=1, ttl=settings.ROUTES_CACHE_TTL_SECONDS)
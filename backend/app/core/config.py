@@ -10,6 +10,30 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 30
+    TOKEN_REVOCATION_BACKEND: str = "postgres"  # "postgres" o "memory"
+    COUNT_CACHE_TTL_SECONDS: int = 60  # Vigencia de los totales estimados de los listados
+    EXACT_COUNT_THRESHOLD: int = 10000  # Por debajo de estas filas (según reltuples) se cuenta exacto
+    ROUTES_CACHE_TTL_SECONDS: int = 300  # Catálogo de rutas en memoria (se invalida al crear paradas)
+    RATING_PRIOR_MEAN: float = 3.0  # Puntuación inicial de platos/restaurantes sin puntuación de catálogo
+    RATING_PRIOR_WEIGHT: int = 5  # Votos "virtuales" con la puntuación inicial en el promedio bayesiano
+    RATING_BATCH_SIZE: int = 500  # Votos aplicados por lote
+    RATING_FLUSH_SECONDS: float = 0.5  # Espera máxima antes de aplicar un lote
+    BCRYPT_ROUNDS: int = 12  # Costo de bcrypt; al subirlo los hashes se rehacen en el siguiente login
+    PASSWORD_HASH_WORKERS: int = 2  # Procesos dedicados a bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 16  # Hashes en curso o en cola antes de responder 503
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2.0  # Segundos esperando un lugar en la cola
+    GLUCOSE_TIMEZONE: str = "America/Bogota"  # Zona horaria para agrupar lecturas por día/semana
+    GLUCOSE_RANGE_LOW: int = 70  # mg/dL, límite inferior del tiempo en rango
+    GLUCOSE_RANGE_HIGH: int = 180  # mg/dL, límite superior del tiempo en rango
+    GLUCOSE_INGEST_CHUNK_SIZE: int = 1000  # Lecturas por bloque (un COPY por transacción) en la carga masiva
+    ALARM_TIMEZONE: str = "America/Bogota"  # Zona horaria en la que se interpretan las horas de las alarmas
+    ALARM_SCHEDULER_ENABLED: bool = True  # Disparar alarmas de medicamentos en este proceso
+    ALARM_NOTIFIER: str = "app.core.alarm_scheduler.LogNotifier"  # Clase con notify(alarms)
+    ALARM_BATCH_SIZE: int = 500  # Alarmas reclamadas por transacción
+    ALARM_POLL_SECONDS: float = 15.0  # Cada cuánto se buscan alarmas nuevas de otros procesos
+    ALARM_CLAIM_SECONDS: float = 120.0  # Tiempo que una alarma reclamada queda reservada; si no se notificó, se reintenta
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,124 @@
+# app/core/glucose_ingest.py
+import codecs
+import csv
+import json
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.crud.glucose_measurement import copy_glucose_readings, measurement_row
+from app.schemas.glucose_measurement import GlucoseReadingCreate
+
+# Tipos de contenido aceptados por la carga masiva
+BULK_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+CSV_COLUMNS = ["measured_at", "level_measured"]
+
+# Errores de validación que se detallan por bloque (el resto solo se cuenta)
+MAX_ERRORS_PER_CHUNK = 50
+
+
+async def iter_lines(stream):
+    """
+    Líneas (en bytes) de un cuerpo recibido por partes, sin cargarlo completo.
+    Se decodifican una a una con decode_line, así un byte inválido solo afecta a su línea.
+    """
+    pending = b""
+    first = True
+    async for data in stream:
+        pending += data
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if first:
+                line, first = line.removeprefix(codecs.BOM_UTF8), False
+            yield line.rstrip(b"\r")
+    if pending:
+        yield (pending.removeprefix(codecs.BOM_UTF8) if first else pending).rstrip(b"\r")
+
+
+def decode_line(line: bytes) -> str:
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # p. ej. exportaciones en Latin-1; la línea se rechaza y el resto sigue
+        raise ValueError(f"La línea no es UTF-8 válido (byte {e.start})") from e
+
+
+def _parse_ndjson(line: str, columns):
+    value = json.loads(line)
+    if not isinstance(value, dict):
+        raise ValueError("Se esperaba un objeto JSON por línea")
+    return value
+
+
+def _parse_csv(line: str, columns):
+    values = next(csv.reader([line]))
+    if len(values) != len(columns):
+        raise ValueError(f"Se esperaban {len(columns)} columnas")
+    return dict(zip(columns, values))
+
+
+async def ingest_glucose_stream(db, patient_id: int, stream, fmt: str):
+    """
+    Valida las lecturas línea a línea y las guarda con COPY en bloques de
+    GLUCOSE_INGEST_CHUNK_SIZE. Cada bloque es una transacción: un bloque que
+    falla no afecta a los demás y su error se informa en el resultado.
+    La memoria usada no depende del tamaño del archivo.
+    """
+    parse = _parse_csv if fmt == "csv" else _parse_ndjson
+    columns = CSV_COLUMNS
+    result = {"inserted": 0, "rejected": 0, "chunks": []}
+    chunk = {"first_line": None, "rows": [], "rejected": 0, "errors": []}
+
+    async def flush(last_line):
+        if chunk["first_line"] is None:
+            return
+        report = {
+            "chunk": len(result["chunks"]) + 1,
+            "first_line": chunk["first_line"],
+            "last_line": last_line,
+            "inserted": 0,
+            "rejected": chunk["rejected"],
+            "errors": chunk["errors"],
+        }
+        if chunk["rows"]:
+            try:
+                report["inserted"] = await run_in_threadpool(copy_glucose_readings, db, chunk["rows"])
+            except Exception as e:
+                report["rejected"] += len(chunk["rows"])
+                report["errors"].append({"line": None, "error": f"Error al guardar el bloque: {e}"})
+        result["inserted"] += report["inserted"]
+        result["rejected"] += report["rejected"]
+        result["chunks"].append(report)
+        chunk.update(first_line=None, rows=[], rejected=0, errors=[])
+
+    line_number = 0
+    async for raw in iter_lines(stream):
+        line_number += 1
+        if not raw.strip():
+            continue
+        if fmt == "csv" and line_number == 1:
+            # Encabezado opcional: define el orden de las columnas
+            header = [c.strip() for c in next(csv.reader([raw.decode("utf-8", errors="replace")]))]
+            if set(header) >= set(CSV_COLUMNS):
+                columns = header
+                continue
+        if chunk["first_line"] is None:
+            chunk["first_line"] = line_number
+        try:
+            reading = GlucoseReadingCreate.model_validate(parse(decode_line(raw), columns))
+            chunk["rows"].append(measurement_row({**reading.model_dump(), "patient_id": patient_id}))
+        except (ValueError, ValidationError) as e:
+            chunk["rejected"] += 1
+            if len(chunk["errors"]) < MAX_ERRORS_PER_CHUNK:
+                chunk["errors"].append({"line": line_number, "error": str(e)})
+        if len(chunk["rows"]) + chunk["rejected"] >= settings.GLUCOSE_INGEST_CHUNK_SIZE:
+            await flush(line_number)
+    await flush(line_number)
+    return result
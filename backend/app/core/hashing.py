@@ -1,10 +1,151 @@
 # app/core/hashing.py
+import multiprocessing
+import secrets
+import threading
+import time
+from typing import Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
 
-def verify_password(plain_password: str, hashed_password: str):
+# Único contexto de hashing de la aplicación. Con min_rounds igual al costo actual,
+# needs_update marca los hashes creados con un costo menor para rehacerlos al iniciar sesión
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt consume ~100-300 ms de CPU por llamada: se ejecuta en un pool de procesos
+# acotado para que una ráfaga de logins no acapare el worker ni el GIL.
+_pool = None
+_pool_lock = threading.Lock()
+_dummy_hash = None
+_dummy_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+_stats_lock = threading.Lock()
+_stats = {
+    "in_flight": 0,
+    "completed": 0,
+    "rejected": 0,
+    "queue_wait_seconds": 0.0,
+    "hash_seconds": 0.0,
+}
+
+
+def _get_pool():
+    # Procesos "spawn": un fork desde el worker ya en marcha copiaría sus hilos
+    # (scheduler, escritor de puntuaciones) y los locks que tuvieran tomados
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _make_dummy_hash():
+    # Hash de una contraseña aleatoria con el costo actual, para emails que no existen
+    global _dummy_hash
+    with _dummy_lock:
+        if _dummy_hash is None:
+            _dummy_hash = _get_pool().submit(_hash, secrets.token_urlsafe(16)).result()
+        return _dummy_hash
+
+
+def start_hashing_pool():
+    """
+    Crea el pool y arranca sus procesos al iniciar la app, no en el primer login.
+    También calcula el hash ficticio, así el primer email desconocido no paga dos bcrypt.
+    """
+    pool = _get_pool()
+    for future in [pool.submit(int) for _ in range(settings.PASSWORD_HASH_WORKERS)]:
+        future.result()
+    _make_dummy_hash()
+
+
+def shutdown_hashing_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def _verify(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
+
+def _hash(password: str):
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _run(fn, *args):
+    """Ejecuta fn en el pool; responde 503 si ya hay demasiadas operaciones en espera"""
+    started = time.perf_counter()
+    if not _slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+        with _stats_lock:
+            _stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio de autenticación saturado, intenta de nuevo",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        with _stats_lock:
+            _stats["in_flight"] += 1
+            _stats["queue_wait_seconds"] += time.perf_counter() - started
+        submitted = time.perf_counter()
+        result = _get_pool().submit(fn, *args).result()
+        with _stats_lock:
+            _stats["completed"] += 1
+            _stats["hash_seconds"] += time.perf_counter() - submitted
+        return result
+    finally:
+        with _stats_lock:
+            _stats["in_flight"] -= 1
+        _slots.release()
+
+
+def hashing_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["workers"] = settings.PASSWORD_HASH_WORKERS
+    stats["max_pending"] = settings.PASSWORD_HASH_MAX_PENDING
+    # Operaciones esperando un proceso libre del pool
+    stats["queued"] = max(stats["in_flight"] - settings.PASSWORD_HASH_WORKERS, 0)
+    return stats
+
+
+def verify_password(plain_password: str, hashed_password: str):
+    return _run(_verify, plain_password, hashed_password)
+
+
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
\ No newline at end of file
+    return _run(_hash, password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña y devuelve (válida, hash nuevo o None). El hash nuevo
+    solo viene cuando el guardado usa un costo o esquema desactualizado.
+
+    Sin hash (email desconocido) se verifica contra un hash ficticio, así un
+    login fallido cuesta lo mismo que uno exitoso y no revela qué emails existen.
+    """
+    if hashed_password is None:
+        _run(_verify, plain_password, _dummy_hash or _make_dummy_hash())
+        return False, None
+    return _run(_verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,127 @@
+# app/core/pagination.py
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Tuple
+
+from fastapi import Response
+from sqlalchemy import text, tuple_
+
+from app.core.cache import count_cache
+from app.core.config import settings
+
+
+def encode_cursor(*values) -> str:
+    """Cursor opaco (base64 de JSON) con los valores de la última fila de la página"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Devuelve los valores del cursor; ValueError si el cursor no es válido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(values, list):
+        raise ValueError("Cursor inválido")
+    return values
+
+
+def coerce_cursor_value(value, column):
+    """
+    Convierte un valor del cursor (JSON) al tipo de la columna: las fechas y los
+    Decimal viajan como texto y los float enteros pueden llegar como int.
+    ValueError si el valor no corresponde al tipo.
+    """
+    python_type = column.type.python_type
+    if value is None or isinstance(value, bool):
+        raise ValueError("Cursor inválido")
+    try:
+        if python_type is int:
+            if not isinstance(value, int):
+                raise ValueError("Cursor inválido")
+            return value
+        if python_type is float:
+            if not isinstance(value, (int, float)):
+                raise ValueError("Cursor inválido")
+            return float(value)
+        if python_type is Decimal:
+            return Decimal(str(value))
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+    except (TypeError, InvalidOperation) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(value, python_type):
+        raise ValueError("Cursor inválido")
+    return value
+
+
+def keyset_page(query, columns, limit: int, cursor: Optional[str] = None, skip: int = 0,
+                descending: bool = False):
+    """
+    Página de `query` ordenada por `columns` (terminando en la clave primaria) a
+    partir del cursor, sin OFFSET: cualquier página cuesta lo mismo que la primera.
+    `skip` (OFFSET) solo se usa sin cursor, por compatibilidad con clientes viejos.
+    Devuelve (filas, next_cursor); ValueError si el cursor no es válido.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise ValueError("Cursor inválido")
+        values = [coerce_cursor_value(value, column) for value, column in zip(values, columns)]
+        key, last = tuple_(*columns), tuple_(*values)
+        query = query.filter(key < last if descending else key > last)
+        skip = 0
+    order = [column.desc() for column in columns] if descending else columns
+    rows = query.order_by(*order).offset(skip).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*(getattr(rows[-1], column.key) for column in columns))
+    return rows, next_cursor
+
+
+def estimated_rows(db, table: str) -> Optional[int]:
+    """Filas de la tabla según las estadísticas de Postgres (None si nunca se analizó)"""
+    estimate = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table}
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def count_total(db, query, table: str, exact: bool = False, cache_key: str = None) -> Tuple[int, bool]:
+    """
+    Total de filas de `query` y si es exacto. Por defecto es barato: el último
+    COUNT(*) guardado en count_cache o, en tablas grandes, pg_class.reltuples.
+    Con exact=True siempre ejecuta COUNT(*).
+    """
+    cache_key = cache_key or table
+    if not exact:
+        cached = count_cache.get(cache_key)
+        if cached is not None:
+            return cached, False
+        estimate = estimated_rows(db, table)
+        if estimate is not None and estimate >= settings.EXACT_COUNT_THRESHOLD:
+            return estimate, False
+    total = query.order_by(None).count()
+    count_cache.set(cache_key, total)
+    return total, True
+
+
+# Cabeceras de paginación para los listados que devuelven una lista JSON
+PAGINATION_HEADERS = ["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Exact"]
+
+
+def set_pagination_headers(response: Response, next_cursor: Optional[str], total: int, exact: bool):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Total-Count-Exact"] = "true" if exact else "false"
@@ -0,0 +1,91 @@
+# app/core/ratings.py
+import logging
+import queue
+import threading
+from collections import defaultdict
+
+from app.core.config import settings
+from app.crud.rating import apply_rating_votes
+
+logger = logging.getLogger(__name__)
+
+
+class RatingWriter(threading.Thread):
+    """
+    Escritura por lotes de los votos de platos y restaurantes.
+
+    Los votos se encolan sin esperar a la base de datos y un hilo los aplica
+    cada `flush_seconds` (o al juntar `batch_size`), con una sentencia por tipo
+    de elemento. Así, con mucho tráfico cada plato se actualiza una vez por lote
+    en vez de bloquear su fila en cada voto. Al detenerlo vacía la cola.
+    """
+
+    def __init__(self, session_factory, batch_size: int = 500, flush_seconds: float = 0.5):
+        super().__init__(name="rating-writer", daemon=True)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+
+    def enqueue(self, kind: str, item_id: int, user_id: int, rating: int):
+        self._queue.put((kind, item_id, user_id, rating))
+
+    def stop(self, timeout: float = 10.0):
+        self._stop_event.set()
+        self.join(timeout)
+
+    def _next_batch(self):
+        lote = []
+        try:
+            lote.append(self._queue.get(timeout=self.flush_seconds))
+        except queue.Empty:
+            return lote
+        while len(lote) < self.batch_size:
+            try:
+                lote.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _flush(self, lote):
+        por_tipo = defaultdict(list)
+        for kind, item_id, user_id, rating in lote:
+            por_tipo[kind].append((item_id, user_id, rating))
+        for kind, votes in por_tipo.items():
+            # Un reintento: dos workers pueden chocar (deadlock) sobre los mismos elementos
+            for intento in range(2):
+                db = self.session_factory()
+                try:
+                    apply_rating_votes(db, kind, votes)
+                    break
+                except Exception:
+                    db.rollback()
+                    if intento:
+                        logger.exception("No se pudieron guardar %d votos de %s", len(votes), kind)
+                finally:
+                    db.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            lote = self._next_batch()
+            if lote:
+                self._flush(lote)
+        # Vaciar lo que quede en la cola antes de terminar
+        while not self._queue.empty():
+            lote = self._next_batch()
+            if lote:
+                self._flush(lote)
+
+
+def create_rating_writer():
+    from app.db.session import SessionLocal
+    return RatingWriter(
+        SessionLocal,
+        batch_size=settings.RATING_BATCH_SIZE,
+        flush_seconds=settings.RATING_FLUSH_SECONDS,
+    )
+
+
+# Escritor del proceso; se arranca y detiene con la aplicación (ver app/main.py)
+rating_writer = create_rating_writer()
@@ -0,0 +1,58 @@
+# app/core/recurrence.py
+import math
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+# Regla de las alarmas de medicamentos: cada día, en hora local, a las
+# start_time + k * frequency_hours con k * frequency_hours < 24 (el día se
+# reinicia en start_time). Las tomas que pasan de medianoche pertenecen al día
+# en que empezaron. Como se calcula sobre la hora local, una alarma de las 08:00
+# sigue sonando a las 08:00 después de un cambio de horario (DST).
+#
+# La siguiente toma después de `t` (hora local) se obtiene sin iterar:
+#   base = hoy a start_time si t >= esa hora, si no ayer a start_time
+#   k    = floor((t - base) / frecuencia) + 1
+#   next = base + k * frecuencia   si k * frecuencia < 24 h
+#          base + 1 día            si no
+
+
+def doses_per_day(frequency_hours: int) -> int:
+    return math.ceil(24 / frequency_hours)
+
+
+def next_alarm_time(start_time: time, frequency_hours: int, now: datetime = None,
+                    tz: str = None) -> datetime:
+    """Próxima toma estrictamente posterior a `now`, como datetime con zona horaria"""
+    zone = ZoneInfo(tz or settings.ALARM_TIMEZONE)
+    now = now or datetime.now(timezone.utc)
+    # Reloj de pared local, sin zona: la regla se aplica sobre la hora que ve el paciente
+    local = now.astimezone(zone).replace(tzinfo=None)
+    base = datetime.combine(local.date(), start_time)
+    if local < base:
+        base -= timedelta(days=1)
+    k = math.floor((local - base) / timedelta(hours=frequency_hours)) + 1
+    if k < doses_per_day(frequency_hours):
+        wall = base + timedelta(hours=k * frequency_hours)
+    else:
+        wall = base + timedelta(days=1)
+    # Una hora local que no existe (salto de DST) se interpreta con el offset anterior
+    return wall.replace(tzinfo=zone)
+
+
+# La misma regla en SQL para recalcular muchas alarmas en un solo UPDATE;
+# :tz es la zona horaria y :now el instante de referencia (timestamptz).
+_LOCAL_NOW = "(CAST(:now AS timestamptz) AT TIME ZONE :tz)"
+_TODAY_START = f"(CAST({_LOCAL_NOW} AS date) + start_time)"
+_BASE = (
+    f"(CASE WHEN {_LOCAL_NOW} >= {_TODAY_START} THEN {_TODAY_START} "
+    f"ELSE {_TODAY_START} - interval '1 day' END)"
+)
+_K = f"(floor(extract(epoch FROM {_LOCAL_NOW} - {_BASE}) / (frequency_hours * 3600)) + 1)"
+
+NEXT_ALARM_TIME_SQL = (
+    f"((CASE WHEN {_K} * frequency_hours < 24 "
+    f"THEN {_BASE} + make_interval(hours => CAST({_K} * frequency_hours AS integer)) "
+    f"ELSE {_BASE} + interval '1 day' END) AT TIME ZONE :tz)"
+)
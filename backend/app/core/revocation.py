@@ -0,0 +1,93 @@
+# app/core/revocation.py
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+
+class MemoryRevocationStore:
+    """Tokens revocados en memoria del proceso (para pruebas o un solo worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {}  # jti -> exp (epoch)
+        self._expirations = []  # heap de (exp, jti) para purgar los vencidos
+
+    def _purge(self, now: float):
+        while self._expirations and self._expirations[0][0] <= now:
+            exp, jti = heapq.heappop(self._expirations)
+            if self._revoked.get(jti) == exp:
+                del self._revoked[jti]
+
+    def revoke(self, jti: str, exp: float, db=None):
+        with self._lock:
+            self._purge(time.time())
+            self._revoked[jti] = exp
+            heapq.heappush(self._expirations, (exp, jti))
+
+    def is_revoked(self, jti: str, db=None) -> bool:
+        with self._lock:
+            exp = self._revoked.get(jti)
+            return exp is not None and exp > time.time()
+
+
+class PostgresRevocationStore:
+    """
+    Tokens revocados en la tabla revoked_tokens, compartida por todos los workers.
+    Cada fila vive hasta el exp del token; las vencidas se borran al revocar otro.
+
+    Con `db` las consultas van por la sesión de la petición (sin tomar otra
+    conexión del pool). Una revocación no se deshace, así que los tokens que este
+    proceso ya vio revocados se responden desde memoria sin consultar la tabla.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._known = MemoryRevocationStore()
+
+    def revoke(self, jti: str, exp: float, db=None):
+        expires_at = datetime.fromtimestamp(exp, tz=timezone.utc)
+        self._known.revoke(jti, exp)
+        if db is not None:
+            self._revoke(db, jti, expires_at)
+            db.commit()
+            return
+        with self.engine.begin() as conn:
+            self._revoke(conn, jti, expires_at)
+
+    def _revoke(self, conn, jti: str, expires_at: datetime):
+        conn.execute(text("DELETE FROM revoked_tokens WHERE expires_at <= now()"))
+        conn.execute(
+            text(
+                "INSERT INTO revoked_tokens (jti, expires_at) VALUES (:jti, :expires_at) "
+                "ON CONFLICT (jti) DO NOTHING"
+            ),
+            {"jti": jti, "expires_at": expires_at}
+        )
+
+    def is_revoked(self, jti: str, db=None) -> bool:
+        if self._known.is_revoked(jti):
+            return True
+        sql = text("SELECT expires_at FROM revoked_tokens WHERE jti = :jti AND expires_at > now()")
+        if db is not None:
+            expires_at = db.execute(sql, {"jti": jti}).scalar()
+        else:
+            with self.engine.connect() as conn:
+                expires_at = conn.execute(sql, {"jti": jti}).scalar()
+        if expires_at is None:
+            return False
+        self._known.revoke(jti, expires_at.timestamp())
+        return True
+
+
+def create_revocation_store():
+    if settings.TOKEN_REVOCATION_BACKEND == "memory":
+        return MemoryRevocationStore()
+    if settings.TOKEN_REVOCATION_BACKEND == "postgres":
+        from app.db.session import engine
+        return PostgresRevocationStore(engine)
+    raise ValueError(f"TOKEN_REVOCATION_BACKEND desconocido: {settings.TOKEN_REVOCATION_BACKEND}")
@@ -1,73 +1,81 @@
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+import hashlib
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
 from app.core.config import settings
 from app.db.session import get_db
-from app.core.hashing import verify_password
-from app.crud.user import get_user_by_email
+from app.core.revocation import create_revocation_store
+from app.crud.user import get_user_by_email, get_user_cached
 
 
 
-# Lista negra de tokens (en producción usar Redis)
-BLACKLISTED_TOKENS = set()
-
-# Configuración de hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Tokens revocados por jti hasta su expiración (ver TOKEN_REVOCATION_BACKEND)
+revocation_store = create_revocation_store()
 
 # Configuración de OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/login")
 
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def add_to_blacklist(token: str):
-    """Añade un token a la lista negra"""
-    BLACKLISTED_TOKENS.add(token)
+def token_id(token: str, payload: dict) -> str:
+    """jti del token; los emitidos antes de incluirlo se identifican por su hash"""
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
 
-def is_token_blacklisted(token: str) -> bool:
-    """Verifica si un token está en la lista negra"""
-    return token in BLACKLISTED_TOKENS
+def revoke_token(token: str, db: Session = None):
+    """Revoca un token hasta su expiración. Si ya no es válido no hace nada."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return
+    revocation_store.revoke(token_id(token, payload), payload["exp"], db=db)
+
+def is_token_revoked(token: str, payload: dict, db: Session = None) -> bool:
+    """Verifica si un token fue revocado (con `db`, por la sesión de la petición)"""
+    return revocation_store.is_revoked(token_id(token, payload), db=db)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# Dependencia síncrona: FastAPI la ejecuta en el threadpool, así las consultas
+# no bloquean el event loop
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # Verifica si el token está en la lista negra
-    if is_token_blacklisted(token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked"
-        )
-    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
+        user_id = payload.get("uid")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_email(db, email=email)
+    # Verifica si el token fue revocado (logout)
+    if is_token_revoked(token, payload, db):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    
+    # Los tokens nuevos llevan el id del usuario: se resuelve por clave primaria y con caché.
+    # Los emitidos antes de este cambio solo traen el email.
+    if user_id is not None:
+        user = get_user_cached(db, user_id=user_id)
+    else:
+        user = get_user_by_email(db, email=email)
     if user is None:
         raise credentials_exception
     return user
\ No newline at end of file
@@ -1,19 +1,65 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.pagination import keyset_page, count_total
 from app.models.calification import Calification
+from app.models.calification_stats import CalificationStats, CALIFICATION_STATS_SHARDS
 from app.schemas.calification import CalificationCreate
 
 def create_calification(db: Session, calification: CalificationCreate):
     db_calification = Calification(**calification.model_dump())
     db.add(db_calification)
+    add_to_calification_stats(db, calification.user_id, calification.rating)
     db.commit()
     db.refresh(db_calification)
     return db_calification
 
-def get_califications(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Calification).offset(skip).limit(limit).all()
+def get_califications(db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0):
+    # Devuelve (calificaciones, next_cursor); paginación por id
+    return keyset_page(db.query(Calification), [Calification.id], limit, cursor, skip)
+
+def count_califications(db: Session, exact: bool = False):
+    return count_total(db, db.query(Calification), "califications", exact)
 
 def get_calification(db: Session, calification_id: int):
     return db.query(Calification).filter(Calification.id == calification_id).first()
 
 def get_califications_by_user(db: Session, user_id: int):
-    return db.query(Calification).filter(Calification.user_id == user_id).all()
\ No newline at end of file
+    return db.query(Calification).filter(Calification.user_id == user_id).all()
+
+def add_to_calification_stats(db: Session, user_id: int, rating: int):
+    """
+    Suma la calificación a los contadores en la misma transacción que el INSERT.
+    Cada usuario cae en un shard fijo, así dos usuarios distintos rara vez se bloquean.
+    """
+    column = f"rating_{rating}"
+    stmt = insert(CalificationStats).values(
+        shard=user_id % CALIFICATION_STATS_SHARDS, count=1, sum=rating, **{column: 1}
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[CalificationStats.shard],
+        set_={
+            "count": CalificationStats.count + 1,
+            "sum": CalificationStats.sum + rating,
+            column: getattr(CalificationStats, column) + 1,
+        }
+    ))
+
+def get_calification_stats(db: Session):
+    # Suma de a lo sumo CALIFICATION_STATS_SHARDS filas: no depende de cuántas calificaciones haya
+    totals = db.query(
+        func.coalesce(func.sum(CalificationStats.count), 0).label("count"),
+        func.coalesce(func.sum(CalificationStats.sum), 0).label("sum"),
+        *[
+            func.coalesce(func.sum(getattr(CalificationStats, f"rating_{rating}")), 0)
+            for rating in range(1, 6)
+        ]
+    ).one()
+    count, total = int(totals[0]), int(totals[1])
+    return {
+        "count": count,
+        "sum": total,
+        "average": total / count if count else None,
+        "histogram": {rating: int(totals[rating + 1]) for rating in range(1, 6)},
+    }
@@ -1,22 +1,37 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from app.core.pagination import keyset_page
 from app.models.chat_message import ChatMessage
 from app.schemas.chat_message import ChatMessageCreate
-from typing import List
+from typing import List, Optional
 
-def create_chat_message(db: Session, message: ChatMessageCreate):
-    db_message = ChatMessage(**message.model_dump())
-    db.add(db_message)
+def create_chat_messages(db: Session, messages: List[ChatMessageCreate]):
+    # Un solo INSERT ... RETURNING para todos los mensajes y un único commit.
+    # Se devuelven las filas insertadas, así no hace falta un refresh por mensaje.
+    if not messages:
+        return []
+    db_messages = db.execute(
+        insert(ChatMessage).returning(
+            ChatMessage.id,
+            ChatMessage.user_id,
+            ChatMessage.role,
+            ChatMessage.content,
+            ChatMessage.timestamp,
+            sort_by_parameter_order=True
+        ),
+        [message.model_dump() for message in messages]
+    ).all()
     db.commit()
-    db.refresh(db_message)
-    return db_message
+    return db_messages
+
+def create_chat_message(db: Session, message: ChatMessageCreate):
+    return create_chat_messages(db, [message])[0]
 
-def get_chat_messages_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(ChatMessage)\
-        .filter(ChatMessage.user_id == user_id)\
-        .order_by(ChatMessage.timestamp.asc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+def get_chat_messages_by_user(db: Session, user_id: int, limit: int = 100, cursor: Optional[str] = None):
+    # Devuelve (mensajes del más reciente al más antiguo, next_cursor); usa el
+    # índice ix_chat_messages_user_id_timestamp sin OFFSET
+    query = db.query(ChatMessage).filter(ChatMessage.user_id == user_id)
+    return keyset_page(query, [ChatMessage.timestamp, ChatMessage.id], limit, cursor, descending=True)
 
 def get_chat_message(db: Session, message_id: int):
     return db.query(ChatMessage).filter(ChatMessage.id == message_id).first()
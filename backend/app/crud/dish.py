@@ -1,19 +1,100 @@
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.pagination import keyset_page, count_total
+from app.crud.rating import bayesian_rating
+from app.db.notify import notify_catalog_changed
 from app.models.dish import Dish
 from app.schemas.dish import DishCreate
 
+# Palabras de la categoría (texto libre) que corresponden a cada condición
+CATEGORY_KEYWORDS = {
+    "diabetes": ("diabetes",),
+    "hypertension": ("hipertensión", "hipertension"),
+    "obesity": ("obesidad",),
+}
+
+
+def conditions_from_category(category: str):
+    """Deriva las etiquetas de condición a partir del texto de la categoría"""
+    text = (category or "").lower()
+    return [
+        condition for condition, keywords in CATEGORY_KEYWORDS.items()
+        if any(keyword in text for keyword in keywords)
+    ]
+
 
 def get_dish(db: Session, dish_id: int):
     return db.query(Dish).filter(Dish.id == dish_id).first()
 
 
-def get_dishes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Dish).filter(Dish.is_active == True).offset(skip).limit(limit).all()
+def get_dishes(db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0,
+               sort: str = "id"):
+    # Devuelve (platos activos, next_cursor); por id o de mejor a peor puntuación (ix_dishes_rating_id)
+    query = db.query(Dish).filter(Dish.is_active == True)
+    if sort == "rating":
+        return keyset_page(query, [Dish.rating, Dish.id], limit, cursor, skip, descending=True)
+    return keyset_page(query, [Dish.id], limit, cursor, skip)
+
+
+def count_dishes(db: Session, exact: bool = False):
+    # El estimado por reltuples incluye los platos inactivos
+    query = db.query(Dish).filter(Dish.is_active == True)
+    return count_total(db, query, "dishes", exact, cache_key="dishes:active")
+
+
+def get_dishes_for_conditions(db: Session, conditions: list[str], limit: int = 100,
+                              cursor: Optional[str] = None, skip: int = 0):
+    # Devuelve (platos activos adecuados para TODAS las condiciones, next_cursor); usa el índice GIN
+    query = db.query(Dish).filter(Dish.is_active == True, Dish.conditions.contains(conditions))
+    return keyset_page(query, [Dish.id], limit, cursor, skip)
+
+
+def search_dishes(
+    db: Session,
+    q: str,
+    limit: int = 20,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    restaurant_id: Optional[int] = None,
+    protein: Optional[str] = None
+):
+    """
+    Búsqueda de platos activos por texto completo (stemming en español sobre
+    nombre, ingredientes, descripción y beneficios) o por parecido del nombre
+    (pg_trgm, tolera errores de tipeo). Ordena por relevancia.
+    """
+    ts_query = func.websearch_to_tsquery("spanish", q)
+    name_similarity = func.word_similarity(q, Dish.name)
+    rank = func.ts_rank_cd(Dish.search_vector, ts_query) + name_similarity
+    query = db.query(Dish).filter(
+        Dish.is_active == True,
+        or_(
+            Dish.search_vector.op("@@")(ts_query),  # ix_dishes_search_vector
+            Dish.name.op("%>")(q),  # ix_dishes_name_trgm
+        )
+    )
+    if min_price is not None:
+        query = query.filter(Dish.price_cop >= min_price)
+    if max_price is not None:
+        query = query.filter(Dish.price_cop <= max_price)
+    if restaurant_id is not None:
+        query = query.filter(Dish.restaurant_id == restaurant_id)
+    if protein:
+        query = query.filter(func.lower(Dish.main_protein) == protein.lower())
+    return query.order_by(rank.desc(), Dish.id).limit(limit).all()
 
 
 def create_dish(db: Session, dish: DishCreate):
-    db_dish = Dish(**dish.model_dump())
+    dish_data = dish.model_dump()
+    if not dish_data["conditions"]:
+        dish_data["conditions"] = conditions_from_category(dish.category)
+    # La puntuación del catálogo es el punto de partida del promedio de votos
+    dish_data["rating_prior"] = dish_data["rating"]
+    dish_data["rating"] = bayesian_rating(dish_data["rating"])
+    db_dish = Dish(**dish_data)
     db.add(db_dish)
+    notify_catalog_changed(db, "dishes")
     db.commit()
     db.refresh(db_dish)
     return db_dish
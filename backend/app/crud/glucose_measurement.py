@@ -1,13 +1,141 @@
+from sqlalchemy import Date, case, cast, func, text
 from sqlalchemy.orm import Session
 from app.models.glucose_measurement import GlucoseMeasurement
 from app.schemas.glucose_measurement import GlucoseMeasurementCreate
+from app.core.config import settings
+from app.core.pagination import keyset_page
+import csv
+import io
+from datetime import datetime, time
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+def localize(value: Optional[datetime]) -> Optional[datetime]:
+    """Fechas sin zona horaria se interpretan en GLUCOSE_TIMEZONE"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=ZoneInfo(settings.GLUCOSE_TIMEZONE))
+    return value
+
+def measurement_row(data: dict) -> dict:
+    """
+    Completa measured_at a partir de measurement_date (inicio del día) y
+    viceversa; sin ninguna de las dos se usa el momento actual. Siempre devuelve
+    las mismas llaves para que las filas puedan ir en un mismo INSERT masivo.
+    Las fechas sin zona horaria se interpretan en GLUCOSE_TIMEZONE.
+    """
+    tz = ZoneInfo(settings.GLUCOSE_TIMEZONE)
+    row = dict(data)
+    measured_at = row.pop("measured_at", None)
+    if measured_at is None:
+        if row.get("measurement_date") is not None:
+            measured_at = datetime.combine(row["measurement_date"], time.min, tzinfo=tz)
+        else:
+            measured_at = datetime.now(tz)
+    measured_at = localize(measured_at)
+    row["measured_at"] = measured_at
+    if row.get("measurement_date") is None:
+        row["measurement_date"] = measured_at.astimezone(tz).date()
+    return row
 
 def create_glucose_measurement(db: Session, glucose_measurement: GlucoseMeasurementCreate):
-    db_glucose_measurement = GlucoseMeasurement(**glucose_measurement.model_dump())
+    db_glucose_measurement = GlucoseMeasurement(**measurement_row(glucose_measurement.model_dump()))
     db.add(db_glucose_measurement)
     db.commit()
     db.refresh(db_glucose_measurement)
     return db_glucose_measurement
 
-def get_glucose_measurements_by_patient(db: Session, patient_id: int, skip: int = 0, limit: int = 100):
-    return db.query(GlucoseMeasurement).filter(GlucoseMeasurement.patient_id == patient_id).offset(skip).limit(limit).all()
\ No newline at end of file
+def get_glucose_measurements_by_patient(
+    db: Session,
+    patient_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """
+    Lecturas del paciente de la más reciente a la más antigua, como
+    (lecturas, next_cursor). Usa el índice ix_glucose_measurements_patient_id_measured_at
+    sin OFFSET; ValueError si el cursor no es válido.
+    """
+    query = db.query(GlucoseMeasurement).filter(GlucoseMeasurement.patient_id == patient_id)
+    if start is not None:
+        query = query.filter(GlucoseMeasurement.measured_at >= start)
+    if end is not None:
+        query = query.filter(GlucoseMeasurement.measured_at < end)
+    return keyset_page(
+        query, [GlucoseMeasurement.measured_at, GlucoseMeasurement.id], limit, cursor, descending=True
+    )
+
+def get_glucose_measurements_version(db: Session, patient_id: int) -> Tuple[int, Optional[int]]:
+    """
+    (cantidad, id máximo) de las lecturas del paciente, con un recorrido del índice
+    ix_glucose_measurements_patient_id_measured_at. Las lecturas solo se insertan,
+    así que cambia cada vez que llega una nueva sin tener que leerlas.
+    """
+    count, max_id = db.query(func.count(GlucoseMeasurement.id), func.max(GlucoseMeasurement.id))\
+        .filter(GlucoseMeasurement.patient_id == patient_id)\
+        .one()
+    return count, max_id
+
+def get_glucose_stats(db: Session, patient_id: int, period: str, start: datetime, end: datetime):
+    """
+    Mínimo, máximo, promedio y tiempo en rango por día o semana, calculados en
+    PostgreSQL sobre el rango [start, end). Los periodos se cortan en GLUCOSE_TIMEZONE.
+    Se agrupa por el alias porque cada parámetro de la expresión se enviaría dos veces.
+    """
+    level = GlucoseMeasurement.level_measured
+    period_start = cast(
+        func.date_trunc(period, func.timezone(settings.GLUCOSE_TIMEZONE, GlucoseMeasurement.measured_at)),
+        Date
+    )
+    in_range = case(
+        (level.between(settings.GLUCOSE_RANGE_LOW, settings.GLUCOSE_RANGE_HIGH), 1.0),
+        else_=0.0
+    )
+    return db.query(
+        period_start.label("period_start"),
+        func.count(level).label("readings"),
+        func.min(level).label("min"),
+        func.max(level).label("max"),
+        func.avg(level).label("mean"),
+        func.avg(in_range).label("time_in_range"),
+    )\
+        .filter(
+            GlucoseMeasurement.patient_id == patient_id,
+            GlucoseMeasurement.measured_at >= start,
+            GlucoseMeasurement.measured_at < end,
+            level.isnot(None),
+        )\
+        .group_by(text("period_start"))\
+        .order_by(text("period_start"))\
+        .all()
+
+COPY_GLUCOSE_SQL = (
+    "COPY glucose_measurements (patient_id, measured_at, measurement_date, level_measured) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+def copy_glucose_readings(db: Session, rows: List[dict]):
+    """
+    Inserta las filas (ya completadas con measurement_row) con COPY y confirma.
+    Mucho más rápido que INSERT para miles de lecturas; si falla no queda ninguna.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow((
+            row["patient_id"],
+            row["measured_at"].isoformat(),
+            row["measurement_date"].isoformat(),
+            row["level_measured"],
+        ))
+    buffer.seek(0)
+    try:
+        # COPY va por la conexión de psycopg2 dentro de la transacción de la sesión
+        with db.connection().connection.cursor() as cur:
+            cur.copy_expert(COPY_GLUCOSE_SQL, buffer)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
@@ -1,33 +1,51 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.models.patient import Patient
 from app.models.insurance import Insurance
 from app.models.glucometer_usage import GlucometerUsage
 from app.models.glucose_measurement import GlucoseMeasurement
 from app.models.diabetes_type import DiabetesType
 from app.schemas.medical import MedicalProfileCreate
+from app.crud.glucose_measurement import measurement_row
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_medical_profile(db: Session, user_id: int, profile: MedicalProfileCreate):
+def get_medical_profile(db: Session, patient_id: int, with_measurements: bool = True):
+    """
+    Paciente con todo su perfil médico: las relaciones uno a uno se traen con
+    JOIN y las mediciones con un segundo SELECT ... IN (dos consultas en total).
+    Con with_measurements=False las mediciones se cargan solo si se leen.
+    """
+    options = [
+        joinedload(Patient.diabetes_type),
+        joinedload(Patient.insurance),
+        joinedload(Patient.glucometer_usage),
+    ]
+    if with_measurements:
+        options.append(selectinload(Patient.glucose_measurements))
+    return db.query(Patient).options(*options).filter(Patient.id == patient_id).first()
+
+def create_medical_profile(db: Session, user_id: int, profile: MedicalProfileCreate, commit: bool = True):
+    """
+    Crea el perfil médico completo en una sola transacción: se usa flush para
+    obtener las llaves y las mediciones se insertan en bloque. Con commit=False
+    el llamador decide cuándo confirmar (p. ej. el registro, junto con el usuario).
+    """
     try:
-        # 1. Crear diabetes type (si aplica)
+        # 1. Crear diabetes type (si aplica) e insurance; un solo flush para obtener sus ids
         db_diabetes = None
         if profile.has_diabetes and profile.diabetes_type:
             db_diabetes = DiabetesType(**profile.diabetes_type.dict())
             db.add(db_diabetes)
-            db.commit()
-            db.refresh(db_diabetes)
 
-        # 2. Crear insurance
         db_insurance = None
         if profile.insurance:
             db_insurance = Insurance(**profile.insurance.dict())
             db.add(db_insurance)
-            db.commit()
-            db.refresh(db_insurance)
+        db.flush()
 
-        # 3. Crear paciente
+        # 2. Crear paciente
         patient_data = {
             "id": user_id,
             "document_number": profile.document_number,
@@ -46,24 +64,23 @@ def create_medical_profile(db: Session, user_id: int, profile: MedicalProfileCre
         }
         db_patient = Patient(**patient_data)
         db.add(db_patient)
-        db.commit()
-        db.refresh(db_patient)
 
-        # 4. Agregar glucometer y mediciones
+        # 3. Agregar glucometer y mediciones
         if profile.glucometer_usage:
             glucometer_data = profile.glucometer_usage.dict()
-            glucometer_data["patient_id"] = db_patient.id
-            db_glucometer = GlucometerUsage(**glucometer_data)
-            db.add(db_glucometer)
+            glucometer_data["patient_id"] = user_id
+            db.add(GlucometerUsage(**glucometer_data))
+        db.flush()
 
         if profile.glucose_measurements:
-            for measurement in profile.glucose_measurements:
-                measurement_data = measurement.dict()
-                measurement_data["patient_id"] = db_patient.id
-                db_measurement = GlucoseMeasurement(**measurement_data)
-                db.add(db_measurement)
+            # Un solo INSERT con todas las filas (insertmanyvalues)
+            db.execute(
+                insert(GlucoseMeasurement),
+                [measurement_row({**m.dict(), "patient_id": user_id}) for m in profile.glucose_measurements]
+            )
 
-        db.commit()
+        if commit:
+            db.commit()
         return True
     except Exception as e:
         db.rollback()
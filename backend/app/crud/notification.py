@@ -1,8 +1,11 @@
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.models.notification import MedicationAlarm
 from app.schemas.notification import MedicationAlarmCreate
-from datetime import datetime, timedelta, time
-from zoneinfo import ZoneInfo
+from app.core.config import settings
+from app.core.recurrence import NEXT_ALARM_TIME_SQL, next_alarm_time
+from datetime import datetime, time, timezone
+from typing import Optional
 
 def create_medication_alarm(db: Session, alarm: MedicationAlarmCreate, user_id: int):
     db_alarm = MedicationAlarm(
@@ -33,17 +36,19 @@ def delete_medication_alarm(db: Session, alarm_id: int, user_id: int):
     return False
 
 def calculate_next_alarm_time(start_time: time, frequency_hours: int) -> datetime:
-    # Zona horaria Bogotá
-    bogota_tz = ZoneInfo("America/Bogota")
-
-    # Obtener la hora actual en Bogotá
-    now = datetime.now(bogota_tz)
-
-    # Crear un datetime con la fecha de hoy y la hora de inicio
-    start_datetime = datetime.combine(now.date(), start_time).replace(tzinfo=bogota_tz)
-
-    # Si la hora de inicio ya pasó hoy, sumar intervalos hasta que esté en el futuro
-    while start_datetime <= now:
-        start_datetime += timedelta(hours=frequency_hours)
-
-    return start_datetime  # Retorna datetime completo, no solo time()
+    # Próxima toma en ALARM_TIMEZONE, calculada sin iterar (ver app/core/recurrence.py)
+    return next_alarm_time(start_time, frequency_hours)
+
+def recompute_next_alarm_times(db: Session, user_id: Optional[int] = None) -> int:
+    """
+    Recalcula next_alarm_time de todas las alarmas (o las de un usuario) en un solo
+    UPDATE, p. ej. después de cambiar ALARM_TIMEZONE. Devuelve cuántas se actualizaron.
+    """
+    sql = f"UPDATE medication_alarms SET next_alarm_time = {NEXT_ALARM_TIME_SQL}"
+    params = {"now": datetime.now(timezone.utc), "tz": settings.ALARM_TIMEZONE}
+    if user_id is not None:
+        sql += " WHERE user_id = :user_id"
+        params["user_id"] = user_id
+    result = db.execute(text(sql), params)
+    db.commit()
+    return result.rowcount
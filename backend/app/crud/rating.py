@@ -0,0 +1,99 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from typing import Iterable, Tuple
+
+# Tipo de elemento -> (tabla de votos, columna del elemento, tabla del elemento)
+RATING_TARGETS = {
+    "dish": ("dish_ratings", "dish_id", "dishes"),
+    "restaurant": ("restaurant_ratings", "restaurant_id", "restaurant"),
+}
+
+# Bloquea los elementos del lote antes de leer los votos anteriores: si otro
+# worker está votando los mismos elementos, se espera a que confirme y la
+# sentencia siguiente (con una instantánea nueva) ya ve sus votos. Sin esto, dos
+# primeros votos concurrentes del mismo usuario se contarían ambos como nuevos.
+LOCK_ITEMS_SQL = """
+    SELECT id FROM {items}
+    WHERE id = ANY(CAST(:item_ids AS integer[]))
+    ORDER BY id
+    FOR UPDATE
+"""
+
+# Un lote de votos en una sola sentencia: guarda cada voto (reemplazando el
+# anterior del mismo usuario) y suma a los totales de cada elemento la diferencia,
+# así cada fila de dishes/restaurant se bloquea una vez por lote y no por voto.
+# Los votos de elementos que ya no existen se descartan.
+APPLY_VOTES_SQL = """
+    WITH incoming (item_id, user_id, rating) AS (
+        SELECT * FROM unnest(
+            CAST(:item_ids AS integer[]), CAST(:user_ids AS integer[]), CAST(:ratings AS integer[])
+        )
+    ),
+    valid AS (
+        SELECT incoming.* FROM incoming JOIN {items} ON {items}.id = incoming.item_id
+    ),
+    previous AS (
+        SELECT valid.item_id, valid.user_id, votes.rating
+        FROM valid JOIN {votes} votes
+            ON votes.{item_column} = valid.item_id AND votes.user_id = valid.user_id
+    ),
+    upserted AS (
+        INSERT INTO {votes} ({item_column}, user_id, rating, updated_at)
+        SELECT item_id, user_id, rating, now() FROM valid
+        ON CONFLICT ({item_column}, user_id) DO UPDATE
+        SET rating = EXCLUDED.rating, updated_at = now()
+        RETURNING {item_column} AS item_id, user_id, rating
+    ),
+    deltas AS (
+        SELECT upserted.item_id,
+               count(*) FILTER (WHERE previous.rating IS NULL) AS new_votes,
+               sum(upserted.rating - coalesce(previous.rating, 0)) AS rating_delta
+        FROM upserted LEFT JOIN previous USING (item_id, user_id)
+        GROUP BY upserted.item_id
+    )
+    UPDATE {items}
+    SET rating_count = {items}.rating_count + deltas.new_votes,
+        rating_sum = {items}.rating_sum + deltas.rating_delta,
+        rating = (:prior_weight * coalesce({items}.rating_prior, :prior_mean)
+                  + {items}.rating_sum + deltas.rating_delta)
+                 / (:prior_weight + {items}.rating_count + deltas.new_votes)
+    FROM deltas
+    WHERE {items}.id = deltas.item_id
+"""
+
+def bayesian_rating(prior, count: int = 0, total: int = 0) -> float:
+    """Promedio de los votos suavizado hacia la puntuación inicial (o RATING_PRIOR_MEAN)"""
+    prior = settings.RATING_PRIOR_MEAN if prior is None else prior
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (weight * prior + total) / (weight + count)
+
+def apply_rating_votes(db: Session, kind: str, votes: Iterable[Tuple[int, int, int]]):
+    """
+    Aplica votos (item_id, user_id, rating) de un tipo de elemento en O(1) por voto.
+    Si el mismo usuario vota varias veces el mismo elemento en el lote, cuenta el último.
+    """
+    votes_table, item_column, items_table = RATING_TARGETS[kind]
+    latest = {}
+    for item_id, user_id, rating in votes:
+        latest[(item_id, user_id)] = rating
+    if not latest:
+        return 0
+    # Orden fijo para que dos lotes concurrentes bloqueen las filas en el mismo orden
+    keys = sorted(latest)
+    db.execute(
+        text(LOCK_ITEMS_SQL.format(items=items_table)),
+        {"item_ids": sorted({item_id for item_id, _ in keys})}
+    )
+    db.execute(
+        text(APPLY_VOTES_SQL.format(votes=votes_table, item_column=item_column, items=items_table)),
+        {
+            "item_ids": [item_id for item_id, _ in keys],
+            "user_ids": [user_id for _, user_id in keys],
+            "ratings": [latest[key] for key in keys],
+            "prior_weight": settings.RATING_PRIOR_WEIGHT,
+            "prior_mean": settings.RATING_PRIOR_MEAN,
+        }
+    )
+    db.commit()
+    return len(keys)
@@ -1,16 +1,33 @@
 from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.pagination import keyset_page, count_total
+from app.crud.rating import bayesian_rating
+from app.db.notify import notify_catalog_changed
 from app.models.restaurant import Restaurant
 from app.schemas.restaurant import RestaurantCreate
 
 def get_restaurant(db: Session, restaurant_id: int):
     return db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
 
-def get_restaurants(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Restaurant).offset(skip).limit(limit).all()
+def get_restaurants(db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0,
+                    sort: str = "id"):
+    # Devuelve (restaurantes, next_cursor); por id o de mejor a peor puntuación (ix_restaurant_rating_id)
+    query = db.query(Restaurant)
+    if sort == "rating":
+        return keyset_page(query, [Restaurant.rating, Restaurant.id], limit, cursor, skip, descending=True)
+    return keyset_page(query, [Restaurant.id], limit, cursor, skip)
+
+def count_restaurants(db: Session, exact: bool = False):
+    return count_total(db, db.query(Restaurant), "restaurant", exact)
 
 def create_restaurant(db: Session, restaurant: RestaurantCreate):
-    db_restaurant = Restaurant(**restaurant.model_dump())
+    restaurant_data = restaurant.model_dump()
+    # La puntuación del catálogo es el punto de partida del promedio de votos
+    restaurant_data["rating_prior"] = restaurant_data["rating"]
+    restaurant_data["rating"] = bayesian_rating(restaurant_data["rating"])
+    db_restaurant = Restaurant(**restaurant_data)
     db.add(db_restaurant)
+    notify_catalog_changed(db, "restaurant")
     db.commit()
     db.refresh(db_restaurant)
     return db_restaurant
\ No newline at end of file
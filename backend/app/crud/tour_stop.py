@@ -1,16 +1,25 @@
 from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.pagination import keyset_page, count_total
 from app.models.tour_stop import TourStop
-from app.schemas.tour_stop import TourStopCreate
+from app.schemas.tour_stop import TourStopCreate, TourRoute
+from app.core.cache import routes_cache
+from itertools import groupby
 
 def create_tour_stop(db: Session, tour_stop: TourStopCreate):
     db_tour_stop = TourStop(**tour_stop.model_dump())
     db.add(db_tour_stop)
     db.commit()
     db.refresh(db_tour_stop)
+    routes_cache.clear()
     return db_tour_stop
 
-def get_tour_stops(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(TourStop).offset(skip).limit(limit).all()
+def get_tour_stops(db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0):
+    # Devuelve (paradas, next_cursor); paginación por la clave (id de ruta, número de parada)
+    return keyset_page(db.query(TourStop), [TourStop.id, TourStop.stop_number], limit, cursor, skip)
+
+def count_tour_stops(db: Session, exact: bool = False):
+    return count_total(db, db.query(TourStop), "tour_stops", exact)
 
 # Buscar por clave primaria compuesta
 def get_tour_stop(db: Session, route_id: int, stop_number: int):
@@ -29,4 +38,20 @@ def get_tour_stops_by_route(db: Session, route_id: int):
 def get_tour_route(db: Session, route_id: int):
     return db.query(TourStop).filter(
         TourStop.id == route_id
-    ).order_by(TourStop.stop_number).all()
\ No newline at end of file
+    ).order_by(TourStop.stop_number).all()
+
+# Obtener todas las rutas con sus paradas: una sola consulta agrupada en Python y cacheada
+def get_all_routes(db: Session):
+    routes = routes_cache.get("routes")
+    if routes is None:
+        stops = db.query(TourStop).order_by(TourStop.id, TourStop.stop_number).all()
+        routes = []
+        for route_id, route_stops in groupby(stops, key=lambda stop: stop.id):
+            route_stops = list(route_stops)
+            routes.append(TourRoute(
+                id=route_id,
+                route_name=route_stops[0].route_name,
+                stops=route_stops
+            ))
+        routes_cache.set("routes", routes)
+    return routes
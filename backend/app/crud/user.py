@@ -1,21 +1,47 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from typing import Optional
+from app.core.pagination import keyset_page, count_total
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, HealthUpdate
+from app.core.cache import user_cache
 from app.core.hashing import get_password_hash
+from app.db.notify import notify_user_changed
+
+def user_snapshot(user: User) -> dict:
+    """Valores de las columnas del usuario, para guardarlos en user_cache"""
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
 
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
 
+def get_user_cached(db: Session, user_id: int):
+    """
+    Igual que get_user pero usando user_cache. El usuario devuelto queda
+    asociado a la sesión `db` sin consultar la base, así que se puede modificar
+    y guardar con db.commit() como cualquier otro.
+    """
+    values = user_cache.get(user_id)
+    if values is None:
+        user = get_user(db, user_id)
+        if user is not None:
+            user_cache.set(user_id, user_snapshot(user))
+        return user
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0):
+    # Devuelve (usuarios, next_cursor); paginación por id
+    return keyset_page(db.query(User), [User.id], limit, cursor, skip)
 
-def get_users_count(db: Session):
-    return db.query(User).count()
+def get_users_count(db: Session, exact: bool = False):
+    # Devuelve (total, ¿es exacto?)
+    return count_total(db, db.query(User), "users", exact)
 
-def create_user(db: Session, user: UserCreate):
+def create_user(db: Session, user: UserCreate, commit: bool = True):
     hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
@@ -32,22 +58,31 @@ def create_user(db: Session, user: UserCreate):
         is_active=True
     )
     db.add(db_user)
+    if not commit:
+        # Solo se obtiene el id; el llamador confirma la transacción
+        db.flush()
+        return db_user
     db.commit()
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate):
-    db_user = db.query(User).filter(User.id == user_id).first()
-    if not db_user:
-        return None
-    
+def update_password_hash(db: Session, user: User, hashed_password: str):
+    # Rehash transparente tras un login con un hash de costo desactualizado
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+    return user
+
+def update_user(db: Session, user: User, user_update: UserUpdate):
     update_data = user_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
-        setattr(db_user, field, value)
+        setattr(user, field, value)
     
+    notify_user_changed(db, user.id)
     db.commit()
-    db.refresh(db_user)
-    return db_user
+    db.refresh(user)
+    user_cache.set(user.id, user_snapshot(user))
+    return user
 
 async def update_health_info(
     db: Session,
@@ -63,8 +98,10 @@ async def update_health_info(
         for field, value in update_dict.items():
             setattr(user, field, value)
         
+        notify_user_changed(db, user.id)
         db.commit()
         db.refresh(user)
+        user_cache.set(user.id, user_snapshot(user))
         return user
     except Exception as e:
         db.rollback()
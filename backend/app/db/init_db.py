@@ -1,6 +1,6 @@
 from app.db.session import SessionLocal
 from app.models.user import User
-from app.core.security import get_password_hash
+from app.core.hashing import get_password_hash
 import os
 
 def init_db():
@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Canales que escucha el asistente para invalidar sus cachés
+CATALOG_CHANNEL = "catalog_changed"
+USER_CHANNEL = "user_changed"
+
+def _notify(db: Session, channel: str, payload: str):
+    """Envía un NOTIFY que Postgres entrega a los oyentes cuando se hace commit"""
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": channel, "payload": payload}
+    )
+
+def notify_catalog_changed(db: Session, table: str):
+    _notify(db, CATALOG_CHANNEL, table)
+
+def notify_user_changed(db: Session, user_id: int):
+    _notify(db, USER_CHANNEL, str(user_id))
@@ -1,4 +1,8 @@
 from app.models.chat_message import ChatMessage
+from app.models.chat_summary import ChatSummary
+from app.models.revoked_token import RevokedToken
+from app.models.calification_stats import CalificationStats
+from app.models.rating import DishRating, RestaurantRating
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.models.notification import MedicationAlarm 
@@ -12,16 +16,36 @@ from app.api.endpoints.medical import router as medical_router
 from app.api.endpoints.notifications import router as notifications_router
 from app.api.endpoints.tour_stops import router as tour_stops_router
 from app.api.endpoints.califications import router as califications_router
+from app.api.endpoints.chat import router as chat_router
 from app.db.init_db import init_db
+from app.core.hashing import shutdown_hashing_pool, start_hashing_pool
+from app.core.alarm_scheduler import create_alarm_scheduler
+from app.core.ratings import rating_writer
+from app.core.config import settings
+from app.core.pagination import PAGINATION_HEADERS
 
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI()
+alarm_scheduler = None
 
 @app.on_event("startup")
 def on_startup():
+    global alarm_scheduler
     init_db()
     print("✅ Initialization complete - Admin user created if needed")
+    rating_writer.start()
+    start_hashing_pool()
+    if settings.ALARM_SCHEDULER_ENABLED:
+        alarm_scheduler = create_alarm_scheduler()
+        alarm_scheduler.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    if alarm_scheduler is not None:
+        alarm_scheduler.stop()
+    rating_writer.stop()
+    shutdown_hashing_pool()
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=PAGINATION_HEADERS + ["ETag"],
 )
 
 
@@ -41,3 +66,4 @@ app.include_router(medical_router, prefix="/api/v1/medical", tags=["Perfil Médi
 app.include_router(notifications_router,prefix="/api/v1/notifications",tags=["Notificaciones"])
 app.include_router(tour_stops_router, prefix="/api/v1", tags=["Tour Stops"])
 app.include_router(califications_router, prefix="/api/v1", tags=["Calificaciones"])
+app.include_router(chat_router, prefix="/api/v1", tags=["Chat"])
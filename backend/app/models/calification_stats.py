@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, BigInteger
+from app.db.session import Base
+
+# Filas en las que se reparten los contadores, para que las inserciones
+# concurrentes no esperen todas por el bloqueo de la misma fila
+CALIFICATION_STATS_SHARDS = 16
+
+class CalificationStats(Base):
+    __tablename__ = "calification_stats"
+
+    # Contadores acumulados de califications; el total es la suma de los shards
+    shard = Column(Integer, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    sum = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rating_1 = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rating_2 = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rating_3 = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rating_4 = Column(BigInteger, nullable=False, default=0, server_default="0")
+    rating_5 = Column(BigInteger, nullable=False, default=0, server_default="0")
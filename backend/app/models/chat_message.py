@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -10,3 +10,8 @@ class ChatMessage(Base):
     role = Column(Text)  # 'user' o 'assistant'
     content = Column(Text)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Historial por usuario, del más reciente al más antiguo (ver migración 0001)
+    __table_args__ = (
+        Index("ix_chat_messages_user_id_timestamp", user_id, timestamp.desc(), id.desc()),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class ChatSummary(Base):
+    __tablename__ = "chat_summaries"
+
+    # Un resumen por usuario, actualizado por el asistente después de los turnos
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    summary = Column(Text, nullable=False)
+    last_message_id = Column(Integer, nullable=False)  # Último chat_messages.id incluido en el resumen
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
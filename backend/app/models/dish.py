@@ -1,6 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, Numeric
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, Numeric, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 from app.db.session import Base
 
+# Texto buscable del plato con stemming en español; el nombre pesa más que el resto
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('spanish', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(ingredients, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('spanish', coalesce(health_benefits, '')), 'C')"
+)
+
 
 class Dish(Base):
     __tablename__ = "dishes"
@@ -9,7 +19,10 @@ class Dish(Base):
     name = Column(Text, index=True)
     restaurant_id = Column(Integer, nullable=False)
     restaurant = Column(Text, nullable=True)
-    rating = Column(Float, nullable=True)
+    rating = Column(Float, nullable=True)  # Promedio bayesiano: rating_prior ajustado con los votos
+    rating_prior = Column(Float, nullable=True)  # Puntuación inicial (la del catálogo)
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
     description = Column(Text)
     health_benefits = Column(Text, nullable=True)
     category = Column(String, nullable=True)
@@ -19,3 +32,21 @@ class Dish(Base):
     main_protein = Column(Text, nullable=True)
     ingredients = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
+    # Condiciones para las que el plato es adecuado; el índice GIN resuelve "conditions @> ..."
+    conditions = Column(ARRAY(String), nullable=False, default=list, server_default="{}")
+    # Columna generada para la búsqueda de texto completo (ver migración 0008)
+    # (diferida: los listados no la cargan)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+    __table_args__ = (
+        Index("ix_dishes_conditions", conditions, postgresql_using="gin"),
+        # Listados ordenados por puntuación (paginación por cursor sobre rating, id)
+        Index("ix_dishes_rating_id", rating, id),
+        Index("ix_dishes_search_vector", "search_vector", postgresql_using="gin"),
+        # Búsqueda aproximada por nombre (errores de tipeo) con pg_trgm
+        Index("ix_dishes_name_trgm", name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
+
+# El índice de trigramas necesita la extensión pg_trgm antes de crear la tabla
+event.listen(Dish.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, Boolean, String, Date, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, Boolean, String, Date, DateTime, ForeignKey, DECIMAL, Index
+from sqlalchemy.sql import func
 from app.db.session import Base
 
 class GlucoseMeasurement(Base):
@@ -12,4 +13,13 @@ class GlucoseMeasurement(Base):
     control_level = Column(String(50))  # "Alto", "Bajo"
     measurement_date = Column(Date)  # fecha de medición
     peak_level = Column(String(50))  # "Más de 130", "Menos de 110"
-    peak_level_value = Column(DECIMAL(5, 2))  # Valor numérico
\ No newline at end of file
+    peak_level_value = Column(DECIMAL(5, 2))  # Valor numérico
+    measured_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Momento de la lectura
+
+    # Serie de tiempo (ver migración 0004): B-tree por paciente y fecha para las
+    # consultas de un paciente, BRIN por fecha para recorridos por rango de tiempo
+    # (las lecturas llegan casi en orden, así que el BRIN ocupa muy poco)
+    __table_args__ = (
+        Index("ix_glucose_measurements_patient_id_measured_at", patient_id, measured_at, id),
+        Index("ix_glucose_measurements_measured_at_brin", measured_at, postgresql_using="brin"),
+    )
@@ -11,7 +11,8 @@ class MedicationAlarm(Base):
     dosage = Column(String(50), nullable=False)
     frequency_hours = Column(Integer, nullable=False)  # Cada cuántas horas
     start_time = Column(Time, nullable=False)          # Primera hora (solo hora)
-    next_alarm_time = Column(DateTime, nullable=False) # Próxima alarma (fecha y hora completa)
+    next_alarm_time = Column(DateTime(timezone=True), nullable=False, index=True) # Próxima alarma (fecha y hora completa)
+    claimed_until = Column(DateTime(timezone=True))    # Reclamada por el scheduler hasta este momento (ver migración 0010)
     
     # Relación opcional para acceso más fácil
     user = relationship("User", back_populates="medication_alarms")
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey
+from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class Patient(Base):
@@ -17,4 +18,9 @@ class Patient(Base):
     doctor_name = Column(String(255))
     doctor_phone = Column(String(20))
     diabetes_type_id = Column(Integer, ForeignKey('diabetes_types.id'))
-    insurance_id = Column(Integer, ForeignKey('insurances.id'))
\ No newline at end of file
+    insurance_id = Column(Integer, ForeignKey('insurances.id'))
+
+    diabetes_type = relationship("DiabetesType")
+    insurance = relationship("Insurance")
+    glucometer_usage = relationship("GlucometerUsage", uselist=False)
+    glucose_measurements = relationship("GlucoseMeasurement", order_by="GlucoseMeasurement.id")
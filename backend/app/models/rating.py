@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, SmallInteger, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+# Un voto por usuario y plato/restaurante; votar de nuevo reemplaza el anterior.
+# Los totales (rating_count, rating_sum) se mantienen en dishes y restaurant.
+
+class DishRating(Base):
+    __tablename__ = "dish_ratings"
+
+    dish_id = Column(Integer, ForeignKey("dishes.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rating = Column(SmallInteger, nullable=False)  # 1 a 5
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RestaurantRating(Base):
+    __tablename__ = "restaurant_ratings"
+
+    restaurant_id = Column(Integer, ForeignKey("restaurant.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    rating = Column(SmallInteger, nullable=False)  # 1 a 5
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
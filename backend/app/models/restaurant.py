@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, Index
 from sqlalchemy.dialects.postgresql import ARRAY
 from app.db.session import Base
 
@@ -8,7 +8,15 @@ class Restaurant(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     location = Column(String)
-    rating = Column(Float(2, 1))  
+    rating = Column(Float)  # Promedio bayesiano: rating_prior ajustado con los votos
+    rating_prior = Column(Float, nullable=True)  # Puntuación inicial (la del catálogo)
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
     image = Column(Text)
     description = Column(Text)
-    specialties = Column(Text) 
+    specialties = Column(Text)
+
+    # Listados ordenados por puntuación (paginación por cursor sobre rating, id)
+    __table_args__ = (
+        Index("ix_restaurant_rating_id", rating, id),
+    )
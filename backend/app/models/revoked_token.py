@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.session import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)  # Identificador del token (claim "jti")
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # exp del token
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field, conint
+from typing import Dict, Optional
 
 class CalificationBase(BaseModel):
     user_id: int
@@ -14,4 +15,10 @@ class Calification(CalificationBase):
         from_attributes = True
 
 class CalificationList(BaseModel):
-    califications: list[Calification]
\ No newline at end of file
+    califications: list[Calification]
+
+class CalificationStats(BaseModel):
+    count: int
+    sum: int
+    average: Optional[float] = None  # None si todavía no hay calificaciones
+    histogram: Dict[int, int]  # Calificación (1-5) -> cantidad
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Optional
 
 class ChatMessageBase(BaseModel):
     user_id: int
@@ -14,4 +15,8 @@ class ChatMessage(ChatMessageBase):
     timestamp: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ChatHistory(BaseModel):
+    messages: List[ChatMessage]  # Del más reciente al más antiguo
+    next_cursor: Optional[str] = None  # None cuando no hay mensajes más antiguos
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
+
+DishCondition = Literal["diabetes", "hypertension", "obesity"]
 
 
 class DishBase(BaseModel):
@@ -14,6 +16,7 @@ class DishBase(BaseModel):
     price_delivery: Optional[float] = None
     main_protein: Optional[str] = None
     ingredients: Optional[str] = None
+    conditions: List[DishCondition] = []
 
 
 class DishCreate(DishBase):
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from datetime import date
-from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
 class GlucoseMeasurementBase(BaseModel):
     patient_id: int
@@ -11,6 +11,7 @@ class GlucoseMeasurementBase(BaseModel):
     measurement_date: date
     peak_level: Optional[str] = None
     peak_level_value: Optional[float] = None
+    measured_at: Optional[datetime] = None
 
 class GlucoseMeasurementCreate(GlucoseMeasurementBase):
     pass
@@ -19,4 +20,48 @@ class GlucoseMeasurement(GlucoseMeasurementBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Lectura de un glucómetro (carga masiva); el paciente es el usuario autenticado
+class GlucoseReadingCreate(BaseModel):
+    measured_at: datetime
+    level_measured: int = Field(gt=0, lt=1000)  # mg/dL
+
+class GlucoseReading(BaseModel):
+    id: int
+    measured_at: datetime
+    level_measured: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class GlucoseReadingPage(BaseModel):
+    readings: List[GlucoseReading]  # De la más reciente a la más antigua
+    next_cursor: Optional[str] = None  # None cuando no hay lecturas más antiguas
+
+class GlucoseRowError(BaseModel):
+    line: Optional[int] = None  # None si el error es del bloque completo
+    error: str
+
+class GlucoseChunkResult(BaseModel):
+    chunk: int
+    first_line: int
+    last_line: int
+    inserted: int
+    rejected: int
+    errors: List[GlucoseRowError]
+
+class GlucoseBulkResult(BaseModel):
+    inserted: int
+    rejected: int
+    chunks: List[GlucoseChunkResult]
+
+class GlucoseStats(BaseModel):
+    period_start: date  # Primer día del periodo en GLUCOSE_TIMEZONE
+    readings: int
+    min: int
+    max: int
+    mean: float
+    time_in_range: float  # Fracción de lecturas entre GLUCOSE_RANGE_LOW y GLUCOSE_RANGE_HIGH
+
+GlucosePeriod = Literal["day", "week"]
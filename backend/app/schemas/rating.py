@@ -0,0 +1,4 @@
+from pydantic import BaseModel, Field
+
+class RatingCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5, description="Puntuación de 1 a 5")
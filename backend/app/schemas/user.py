@@ -58,6 +58,8 @@ class UserList(BaseModel):
     per_page: int
     total: int
     total_pages: int
+    total_exact: bool = True  # False si total es un estimado
+    next_cursor: Optional[str] = None  # None en la última página
 
     class Config:
         from_attributes = True
@@ -0,0 +1,102 @@
+"""
+Recalcular next_alarm_time de 1.000.000 de alarmas.
+
+Compara la forma cerrada de app.core.recurrence con el ciclo anterior (sumar
+frequency_hours hasta pasar `now`) sobre alarmas sintéticas. Con --database-url
+también mide el UPDATE de crud.notification.recompute_next_alarm_times (mismo
+NEXT_ALARM_TIME_SQL) sobre una tabla temporal con las mismas columnas; no toca
+medication_alarms.
+
+    cd backend && python -m benchmarks.bench_alarm_recompute --alarms 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time as clock
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings exige la configuración de la base aunque aquí no se use
+for name, value in {
+    "POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432", "POSTGRES_DB": "bench", "SECRET_KEY": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.core.config import settings  # noqa: E402
+from app.core.recurrence import NEXT_ALARM_TIME_SQL, next_alarm_time  # noqa: E402
+
+FREQUENCIES = (1, 2, 4, 6, 8, 12, 24)
+
+
+def loop_next_alarm_time(start_time: time, frequency_hours: int, now: datetime, zone: ZoneInfo):
+    # Ciclo anterior de crud.notification: sumar frequency_hours desde start_time hasta pasar `now`
+    local_now = now.astimezone(zone)
+    start = datetime.combine(local_now.date(), start_time).replace(tzinfo=zone)
+    while start <= local_now:
+        start += timedelta(hours=frequency_hours)
+    return start
+
+
+def generar_alarmas(n: int, rng: random.Random):
+    return [
+        (time(rng.randrange(24), rng.choice((0, 15, 30, 45))), rng.choice(FREQUENCIES))
+        for _ in range(n)
+    ]
+
+
+def medir(nombre: str, fn, alarmas):
+    inicio = clock.perf_counter()
+    for start_time, frequency_hours in alarmas:
+        fn(start_time, frequency_hours)
+    total = clock.perf_counter() - inicio
+    print(f"{nombre:<14} {total:8.2f} s  ({total / len(alarmas) * 1e6:6.2f} µs por alarma)")
+
+
+def medir_sql(database_url: str, n: int, now: datetime, tz: str):
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TEMP TABLE bench_alarms ON COMMIT DROP AS
+            SELECT g AS id,
+                   make_time(g % 24, (g % 4) * 15, 0) AS start_time,
+                   (ARRAY[1, 2, 4, 6, 8, 12, 24])[g % 7 + 1] AS frequency_hours,
+                   CAST(NULL AS timestamptz) AS next_alarm_time
+            FROM generate_series(1, :n) AS g
+        """), {"n": n})
+        conn.execute(text("ANALYZE bench_alarms"))
+        inicio = clock.perf_counter()
+        conn.execute(
+            text(f"UPDATE bench_alarms SET next_alarm_time = {NEXT_ALARM_TIME_SQL}"),
+            {"now": now, "tz": tz}
+        )
+        total = clock.perf_counter() - inicio
+    print(f"{'UPDATE (SQL)':<14} {total:8.2f} s  ({total / n * 1e6:6.2f} µs por alarma)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alarms", type=int, default=1_000_000)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    tz = settings.ALARM_TIMEZONE
+    zone = ZoneInfo(tz)
+    # 23:59 local: el peor caso del ciclo (una alarma horaria de las 00:00 da 23 vueltas)
+    now = datetime.combine(datetime.now(zone).date(), time(23, 59), tzinfo=zone).astimezone(timezone.utc)
+    alarmas = generar_alarmas(args.alarms, random.Random(42))
+    print(f"{args.alarms} alarmas, zona {tz}, now={now.isoformat()}")
+
+    medir("forma cerrada", lambda s, f: next_alarm_time(s, f, now, tz), alarmas)
+    medir("ciclo anterior", lambda s, f: loop_next_alarm_time(s, f, now, zone), alarmas)
+    if args.database_url:
+        medir_sql(args.database_url, args.alarms, now, tz)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Logins por segundo (por núcleo) de la verificación de contraseñas.
+
+Mide bcrypt directo en el proceso y a través del pool de app.core.hashing con
+varias peticiones concurrentes, como las haría el threadpool de FastAPI.
+
+    cd backend && python -m benchmarks.bench_hashing --logins 40 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings exige la configuración de la base aunque aquí no se use
+for name, value in {
+    "POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432", "POSTGRES_DB": "bench", "SECRET_KEY": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.core.config import settings  # noqa: E402
+from app.core import hashing  # noqa: E402
+
+
+def bench_inline(hashed: str, logins: int) -> float:
+    started = time.perf_counter()
+    for _ in range(logins):
+        hashing.pwd_context.verify("contraseña-correcta", hashed)
+    return logins / (time.perf_counter() - started)
+
+
+def bench_pool(hashed: str, logins: int, concurrency: int) -> float:
+    hashing.start_hashing_pool()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as requests:
+        results = list(requests.map(
+            lambda _: hashing.verify_and_update_password("contraseña-correcta", hashed),
+            range(logins),
+        ))
+    elapsed = time.perf_counter() - started
+    assert all(valid for valid, _ in results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = settings.PASSWORD_HASH_WORKERS
+    hashed = hashing.pwd_context.hash("contraseña-correcta")
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS} núcleos={cores} workers del pool={workers}")
+
+    inline = bench_inline(hashed, args.logins)
+    print(f"en proceso:  {inline:7.2f} logins/s  ({1000 / inline:6.1f} ms por login)")
+
+    try:
+        pooled = bench_pool(hashed, args.logins, args.concurrency)
+    finally:
+        hashing.shutdown_hashing_pool()
+    per_core = pooled / min(workers, cores)
+    print(f"pool:        {pooled:7.2f} logins/s  ({per_core:6.2f} logins/s por núcleo, "
+          f"concurrencia {args.concurrency})")
+    print(hashing.hashing_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from sqlalchemy.dialects import postgresql
+
+from conftest import compile_pg
+
+from app.crud.calification import add_to_calification_stats, create_calification, get_calification_stats
+from app.models.calification_stats import CALIFICATION_STATS_SHARDS
+from app.schemas.calification import CalificationCreate
+
+
+def test_create_calification_upserts_user_shard(recording_session):
+    db = recording_session()
+    create_calification(db, CalificationCreate(user_id=CALIFICATION_STATS_SHARDS + 3, rating=4))
+
+    assert len(db.added) == 1 and db.commits == 1
+    (statement, _), = db.executed
+    sql = compile_pg(statement)
+    assert "INSERT INTO calification_stats" in sql
+    assert "ON CONFLICT (shard) DO UPDATE" in sql
+    assert "rating_4" in sql
+    params = statement.compile(dialect=postgresql.dialect()).params
+    assert params["shard"] == 3 and params["count"] == 1 and params["sum"] == 4
+
+
+def test_add_to_calification_stats_only_touches_rating_column(recording_session):
+    db = recording_session()
+    add_to_calification_stats(db, user_id=1, rating=2)
+    update = compile_pg(db.executed[0][0]).split("DO UPDATE SET", 1)[1]
+    assert "rating_2 = (calification_stats.rating_2 +" in update
+    assert "rating_5" not in update
+
+
+def test_get_calification_stats_builds_histogram(recording_session):
+    db = recording_session(query_result=(10, 35, 1, 1, 2, 3, 3))
+    stats = get_calification_stats(db)
+    assert stats == {
+        "count": 10,
+        "sum": 35,
+        "average": 3.5,
+        "histogram": {1: 1, 2: 1, 3: 2, 4: 3, 5: 3},
+    }
+
+
+def test_get_calification_stats_empty(recording_session):
+    db = recording_session(query_result=(0, 0, 0, 0, 0, 0, 0))
+    assert get_calification_stats(db)["average"] is None
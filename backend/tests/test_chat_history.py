@@ -0,0 +1,18 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.endpoints import chat
+
+
+class FakeQuery:
+    def filter(self, *criteria):
+        return self
+
+
+def test_invalid_cursor_is_a_bad_request():
+    db = SimpleNamespace(query=lambda model: FakeQuery())
+    with pytest.raises(HTTPException) as error:
+        chat.read_chat_history(limit=20, before="no-es-un-cursor", db=db, current_user=SimpleNamespace(id=1))
+    assert error.value.status_code == 400
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from app.api.endpoints import medical
+from app.api.endpoints.medical import etag_matches
+
+ETAG = '"0123456789abcdef0123456789abcdef"'
+
+
+@pytest.mark.parametrize("header", [
+    ETAG,
+    f'W/{ETAG}',
+    f'"otro", {ETAG}',
+    f'"otro",W/{ETAG} , "mas"',
+    "*",
+])
+def test_matches(header):
+    assert etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    '"0123456789abcdef"',
+    '"0123456789abcdef0123456789abcdef0"',
+    f'"x{ETAG[1:]}',
+    ETAG[1:-1],
+    '"otro", "mas"',
+])
+def test_does_not_match(header):
+    assert not etag_matches(header, ETAG)
+
+
+class Patient(SimpleNamespace):
+    @property
+    def glucose_measurements(self):
+        self.measurements_loaded = True
+        return []
+
+
+def test_not_modified_profile_skips_the_measurements(monkeypatch):
+    patient = Patient(
+        id=1, document_number="123", document_type="CC", city="Cali", country="Colombia",
+        height_cm=170, weight_kg=70, has_prediabetes=False, has_diabetes=False,
+        diagnosis_date=None, doctor_name=None, doctor_phone=None,
+        diabetes_type=None, insurance=None, glucometer_usage=None, measurements_loaded=False,
+    )
+    monkeypatch.setattr(medical, "get_medical_profile", lambda db, patient_id, with_measurements: patient)
+    monkeypatch.setattr(medical, "get_glucose_measurements_version", lambda db, patient_id: (3, 9))
+
+    def get(if_none_match=None):
+        request = SimpleNamespace(headers={"if-none-match": if_none_match} if if_none_match else {})
+        response = Response()
+        return medical.get_medical_profile_endpoint(request, response, db=None, current_user=SimpleNamespace(id=1)), response
+
+    _, response = get()
+    assert patient.measurements_loaded
+    patient.measurements_loaded = False
+    result, _ = get(response.headers["ETag"])
+    assert result.status_code == 304
+    assert not patient.measurements_loaded
@@ -0,0 +1,25 @@
+import asyncio
+
+from app.core import glucose_ingest
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def test_invalid_bytes_reject_only_their_line(monkeypatch):
+    guardadas = []
+    monkeypatch.setattr(glucose_ingest, "copy_glucose_readings", lambda db, rows: guardadas.extend(rows) or len(rows))
+    body = chunks(
+        b"\xef\xbb\xbfmeasured_at,level_measured\r\n2026-10-17T08:00:00+00:00,110\n",
+        b"2026-10-17T09:00:00+00:00,1\xff5\n2026-10-17T10",
+        b":00:00+00:00,120",
+    )
+
+    result = asyncio.run(glucose_ingest.ingest_glucose_stream(None, 1, body, "csv"))
+
+    assert result["inserted"] == 2
+    assert result["rejected"] == 1
+    assert [e["line"] for e in result["chunks"][0]["errors"]] == [3]
+    assert [row["level_measured"] for row in guardadas] == [110, 120]
@@ -0,0 +1,55 @@
+from datetime import date, datetime
+
+from app.crud.glucose_measurement import measurement_row
+from app.crud.medical import create_medical_profile
+from app.schemas.medical import MedicalProfileCreate
+
+
+def make_profile(measurements):
+    return MedicalProfileCreate(
+        document_number="123",
+        document_type="CC",
+        city="Cartagena",
+        country="Colombia",
+        height_cm=170,
+        weight_kg=70,
+        has_prediabetes=False,
+        has_diabetes=True,
+        insurance={
+            "policy_name": "Básica",
+            "policy_number": "P-1",
+            "eps": "EPS",
+            "medical_center": "Centro",
+            "available_in_cartagena": True,
+        },
+        glucometer_usage={"uses_glucometer": True},
+        glucose_measurements=measurements,
+    )
+
+
+def test_measurement_row_without_dates_uses_now():
+    row = measurement_row({"patient_id": 1, "level_measured": 120})
+    assert row["measured_at"].tzinfo is not None
+    assert row["measurement_date"] == row["measured_at"].date()
+
+
+def test_measurement_row_localizes_naive_datetime():
+    row = measurement_row({"patient_id": 1, "measured_at": datetime(2026, 1, 2, 23, 30)})
+    assert row["measured_at"].tzinfo is not None
+    assert row["measurement_date"] == date(2026, 1, 2)
+
+
+def test_medical_profile_bulk_insert_rows_share_keys(recording_session):
+    db = recording_session()
+    profile = make_profile([
+        {"level_measured": 110, "measurement_date": date(2026, 1, 1)},
+        {"level_measured": 140},
+        {"uncontrolled": True, "measurement_date": date(2026, 1, 3)},
+    ])
+    create_medical_profile(db, user_id=7, profile=profile)
+
+    (_, rows), = db.executed
+    assert len(rows) == 3
+    assert len({frozenset(row) for row in rows}) == 1
+    assert all(row["measured_at"] is not None and row["patient_id"] == 7 for row in rows)
+    assert rows[0]["measurement_date"] == date(2026, 1, 1)
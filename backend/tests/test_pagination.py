@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, Numeric, Table, MetaData, create_engine
+from sqlalchemy.orm import Session
+
+from app.core.pagination import coerce_cursor_value, decode_cursor, encode_cursor, keyset_page
+from app.models.dish import Dish
+from app.models.restaurant import Restaurant
+
+table = Table(
+    "cursor_types", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("amount", Numeric(10, 2)),
+    Column("created_at", DateTime(timezone=True)),
+)
+
+# Dos filas por instante para que el desempate por id importe
+START = datetime(2026, 10, 17, 12, 0)
+events = Table(
+    "events", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("created_at", DateTime),
+)
+
+
+@pytest.fixture
+def events_page():
+    engine = create_engine("sqlite://")
+    events.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(events.insert(), [
+            {"id": i, "created_at": START - timedelta(minutes=i // 2)} for i in range(1, 6)
+        ])
+    with Session(engine) as db:
+        yield lambda limit, cursor=None: keyset_page(
+            db.query(events), [events.c.created_at, events.c.id], limit, cursor, descending=True
+        )
+
+
+def round_trip(*values):
+    return decode_cursor(encode_cursor(*values))
+
+
+@pytest.mark.parametrize("column", [Restaurant.rating, Dish.rating])
+def test_rating_cursor_round_trips(column):
+    rating, item_id = round_trip(4.285714285714286, 12)
+    assert coerce_cursor_value(rating, column) == 4.285714285714286
+    assert coerce_cursor_value(item_id, Restaurant.id) == 12
+
+
+def test_whole_float_rating_arrives_as_int():
+    assert coerce_cursor_value(4, Restaurant.rating) == 4.0
+
+
+def test_decimal_and_datetime_cursor_values():
+    created_at = datetime(2026, 10, 17, 8, 30, tzinfo=timezone.utc)
+    amount, when = round_trip(Decimal("12.50"), created_at)
+    assert coerce_cursor_value(amount, table.c.amount) == Decimal("12.50")
+    assert coerce_cursor_value(when, table.c.created_at) == created_at
+
+
+@pytest.mark.parametrize("value, column", [
+    ("4.5", Restaurant.rating),
+    (None, Restaurant.rating),
+    (1.5, Restaurant.id),
+    (True, Restaurant.id),
+    ("ayer", table.c.created_at),
+    ("x", table.c.amount),
+])
+def test_invalid_cursor_values(value, column):
+    with pytest.raises(ValueError):
+        coerce_cursor_value(value, column)
+
+
+def test_descending_keyset_walks_to_the_end(events_page):
+    first, cursor = events_page(limit=2)
+    assert [row.id for row in first] == [1, 3]
+    second, cursor = events_page(limit=2, cursor=cursor)
+    assert [row.id for row in second] == [2, 5]
+    last, cursor = events_page(limit=2, cursor=cursor)
+    assert [row.id for row in last] == [4]
+    assert cursor is None
+
+
+def test_no_cursor_when_last_page_is_exactly_full(events_page):
+    rows, cursor = events_page(limit=5)
+    assert len(rows) == 5
+    assert cursor is None
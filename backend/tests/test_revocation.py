@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.revocation import PostgresRevocationStore
+
+
+class NoEngine:
+    """El store no debe abrir conexiones propias cuando recibe la sesión"""
+
+    def connect(self):
+        raise AssertionError("consulta fuera de la sesión de la petición")
+
+    begin = connect
+
+
+def test_postgres_store_checks_through_request_session(recording_session):
+    store = PostgresRevocationStore(NoEngine())
+    db = recording_session(scalar_result=None)
+    assert store.is_revoked("abc", db=db) is False
+    assert len(db.executed) == 1
+    assert "revoked_tokens" in str(db.executed[0][0])
+
+
+def test_postgres_store_remembers_revoked_tokens(recording_session):
+    store = PostgresRevocationStore(NoEngine())
+    db = recording_session(scalar_result=datetime.now(timezone.utc) + timedelta(minutes=5))
+    assert store.is_revoked("abc", db=db) is True
+    assert store.is_revoked("abc", db=db) is True
+    assert len(db.executed) == 1
+
+
+def test_postgres_store_revoke_uses_session(recording_session):
+    store = PostgresRevocationStore(NoEngine())
+    db = recording_session()
+    store.revoke("abc", (datetime.now(timezone.utc) + timedelta(minutes=5)).timestamp(), db=db)
+    assert len(db.executed) == 2 and db.commits == 1
+    assert store.is_revoked("abc", db=db) is True
+    assert len(db.executed) == 2
+
+
+def test_get_current_user_is_sync_and_rejects_revoked_token(recording_session, monkeypatch):
+    monkeypatch.setattr(security, "revocation_store", PostgresRevocationStore(NoEngine()))
+    token = security.create_access_token({"sub": "ana@example.com", "uid": 1})
+    db = recording_session()
+    security.revoke_token(token, db)
+
+    assert not asyncio.iscoroutinefunction(security.get_current_user)
+    with pytest.raises(HTTPException) as error:
+        security.get_current_user(token=token, db=db)
+    assert error.value.status_code == 401
+    assert error.value.detail == "Token has been revoked"